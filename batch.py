@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import output_sink
+from scheduler import Busy
+
+MAX_BATCH_FILES = 50
+
+
+def _output_names(paths, output_ext):
+    """Maps each input to a unique output file name."""
+    names = []
+    seen = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem + output_ext
+        n = 2
+        while name in seen:
+            name = f"{stem}_{n}{output_ext}"
+            n += 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def convert_one(convert, path, name, out_dir, work_dir, workspace, options, session=None):
+    """
+    Converts a single batch input into ``out_dir/name``.
+    Failures are recorded in the entry instead of raised.
+
+    Returns:
+        dict: the manifest entry of one input
+    """
+    out_path = os.path.join(out_dir, name)
+    entry = {
+        'input': os.path.basename(path),
+        'output': name,
+        'status': 'ok',
+    }
+    started = time.perf_counter()
+    try:
+        with open(out_path, 'wb') as out:
+            report = convert(path, out, work_dir, session=session, **options)
+        entry['bytes'] = os.path.getsize(out_path)
+        if report:
+            entry['report'] = report
+        workspace.reserve(entry['bytes'])
+    except Exception as e:
+        print(f"Batch item failed ({entry['input']}): {e}")
+        entry['status'] = 'error'
+        entry['error'] = str(e)
+        entry['output'] = None
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def run_batch(submit, paths, output_ext, workspace, options=None, max_running=None):
+    """
+    Converts every input as its own job, so the files of a batch run in
+    parallel within the limits of the converter's resource class.
+
+    Args:
+        submit: ``submit(index, path, name, out_dir, work_dir, workspace, options)``
+                queues one file and returns a Future of its manifest entry
+                (see convert_one). It raises scheduler.Busy when the queue
+                is full; the batch then waits for one of its own files and
+                tries again.
+        max_running: most files of this batch queued or running at once,
+                     so one large batch cannot fill the whole queue
+
+    Returns:
+        list: one manifest entry per input, in upload order
+
+    Raises:
+        Busy: when the queue is full and none of this batch's files is
+              left to wait for
+    """
+    options = options or {}
+    out_dir = workspace.mkdir('batch_out')
+    names = _output_names(paths, output_ext)
+    manifest = [None] * len(paths)
+    running = {}
+
+    def collect(done):
+        for future in done:
+            manifest[running.pop(future)] = future.result()
+
+    try:
+        for index, path in enumerate(paths):
+            work_dir = workspace.mkdir(f'batch_work_{index}')
+            if max_running and len(running) >= max_running:
+                collect(wait(running, return_when=FIRST_COMPLETED).done)
+            while True:
+                try:
+                    future = submit(index, path, names[index], out_dir, work_dir, workspace, options)
+                    break
+                except Busy:
+                    if not running:
+                        raise
+                    collect(wait(running, return_when=FIRST_COMPLETED).done)
+            running[future] = index
+        collect(wait(running).done)
+    except BaseException:
+        # Don't leave queued files behind for a request that has failed
+        for future in running:
+            future.cancel()
+        raise
+
+    return manifest
+
+
+def send_manifest_zip(manifest, workspace, download_name):
+    """
+    Streams back a ZIP of the successful outputs plus manifest.json.
+    """
+    if not any(entry['status'] == 'ok' for entry in manifest):
+        return json.dumps({'files': manifest}), 500, {'Content-Type': 'application/json'}
+
+    manifest_path = workspace.join('manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'files': manifest}, f, indent=2)
+
+    out_dir = workspace.join('batch_out')
+    members = [
+        (entry['output'], os.path.join(out_dir, entry['output']))
+        for entry in manifest if entry['status'] == 'ok'
+    ]
+    members.append(('manifest.json', manifest_path))
+
+    return output_sink.stream_response(
+        output_sink.iter_zip(members),
+        download_name=download_name,
+        mimetype='application/zip'
+    )
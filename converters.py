@@ -0,0 +1,719 @@
+import io
+import os
+import shutil
+import zipfile
+
+import fitz
+from PIL import Image
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+
+import cost_model
+import docx_images
+import output_sink
+import page_ops
+import pdf_compress
+import registry
+import tabular
+import target_size
+import temp_storage
+import zip_handler
+from registry import BROWSER, CPU, IMAGE_TYPES, IO, Converter, Page
+
+# Every converter here has the same shape:
+#
+#     convert(input_path, out, work_dir, session=None, **options)
+#
+# ``out`` is a writable binary file object (an OutputSink for a single
+# request, a file in the workspace for a batch), ``work_dir`` is a private
+# scratch directory and ``session`` is shared setup such as a browser that
+# can be reused across files of the same batch.
+#
+# Converters that combine several uploads into one output take a list of
+# input paths instead of a single one (``multi_input`` in the registry).
+# A converter may return a dict describing what it did; it is sent back in
+# batch manifests, and summarized in the X-Conversion-Report header (see
+# job_reports.py).
+
+
+class ConversionError(Exception):
+    """A problem with the uploaded input; reported to the user as a 400."""
+
+
+# ==========================
+# SHARED BROWSER
+# ==========================
+
+class BrowserSession:
+    """
+    One headless Chromium, launched on first use and reused for every
+    document rendered by the same thread.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+
+    def new_page(self):
+        if self._browser is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch()
+        return self._browser.new_page()
+
+    def close(self):
+        if self._browser is not None:
+            self._browser.close()
+            self._playwright.stop()
+        self._browser = None
+        self._playwright = None
+
+
+def _render_html_to_pdf(html_path, out, session, **pdf_options):
+    owned = session is None
+    if owned:
+        session = BrowserSession()
+    try:
+        page = session.new_page()
+        try:
+            page.goto(f"file:///{html_path}")
+            page.emulate_media(media="print")
+            out.write(page.pdf(**pdf_options))
+        finally:
+            page.close()
+    finally:
+        if owned:
+            session.close()
+
+
+# ==========================
+# IMAGES → PDF
+# ==========================
+
+def images_to_pdf(image_paths, out, work_dir, session=None):
+    pil_images = []
+    for path in image_paths:
+        try:
+            img = Image.open(path)
+
+            if img.mode in ('RGBA', 'P'):
+                img = img.convert('RGB')
+
+            pil_images.append(img)
+        except Exception as e:
+            print(f"Error opening image {path}: {e}")
+
+    if not pil_images:
+        raise ConversionError("Could not read any of the uploaded images.")
+
+    # Save the first image, and append the rest
+    pil_images[0].save(
+        out,
+        format='PDF',
+        save_all=True,
+        append_images=pil_images[1:]
+    )
+
+
+def heic_to_pdf(heic_paths, out, work_dir, session=None):
+    images = []
+    try:
+        for path in heic_paths:
+            img = Image.open(path)
+            img = img.convert("RGB")  # ensure proper PDF compatibility
+            images.append(img)
+
+        images[0].save(out, format='PDF', save_all=True, append_images=images[1:])
+    finally:
+        for img in images:
+            img.close()
+
+
+# ==========================
+# ZIP (FOLDER OF IMAGES) → PDF
+# ==========================
+
+def zip_to_pdf(zip_path, out, work_dir, session=None):
+    try:
+        # Image members are read straight from the archive - nothing is extracted
+        pages = zip_handler.zip_images_to_pdf(zip_path, out)
+    except zip_handler.ZipLimitError as e:
+        raise ConversionError(f"ZIP rejected: {e}")
+    except zipfile.BadZipFile:
+        raise ConversionError("The uploaded file is not a valid ZIP archive.")
+
+    if not pages:
+        raise ConversionError("No supported images found inside the ZIP.")
+
+
+# ==========================
+# PDF MERGE / SPLIT
+# ==========================
+
+def merge_pdfs(pdf_paths, out, work_dir, session=None):
+    merger = PdfMerger()
+    try:
+        for p in pdf_paths:
+            merger.append(p)
+        merger.write(out)
+    finally:
+        merger.close()
+
+
+def split_pdf(pdf_path, out, work_dir, session=None):
+    input_pdf = PdfReader(pdf_path)
+    split_dir = os.path.join(work_dir, "split")
+    os.makedirs(split_dir, exist_ok=True)
+
+    def split_pages():
+        # Each page is written just before its ZIP member is streamed
+        for i, page in enumerate(input_pdf.pages):
+            writer = PdfWriter()
+            writer.add_page(page)
+            page_path = os.path.join(split_dir, f"page_{i+1}.pdf")
+            with open(page_path, "wb") as f:
+                writer.write(f)
+            temp_storage.reserve_file(page_path)
+            yield f"page_{i+1}.pdf", page_path
+
+    for chunk in output_sink.iter_zip(split_pages()):
+        out.write(chunk)
+
+
+# ==========================
+# PDF PAGE OPERATIONS
+# ==========================
+
+# Edits are appended to the uploaded file as an incremental update, see page_ops.py
+
+def _edit_pages(pdf_path, out, operation, **arguments):
+    try:
+        report = page_ops.apply(pdf_path, operation, **arguments)
+    except page_ops.PageSpecError as e:
+        raise ConversionError(str(e))
+    except fitz.FileDataError:
+        raise ConversionError("The uploaded file is not a readable PDF.")
+
+    # Hand the edited file over as-is instead of copying it
+    if not (isinstance(out, output_sink.OutputSink) and out.adopt(pdf_path)):
+        with open(pdf_path, 'rb') as f:
+            shutil.copyfileobj(f, out)
+    return report
+
+
+def rotate_pages(pdf_path, out, work_dir, session=None, pages='', angle=90):
+    return _edit_pages(pdf_path, out, 'rotate', pages=pages, angle=angle)
+
+
+def reorder_pages(pdf_path, out, work_dir, session=None, order=''):
+    return _edit_pages(pdf_path, out, 'reorder', order=order)
+
+
+def delete_pages(pdf_path, out, work_dir, session=None, pages=''):
+    return _edit_pages(pdf_path, out, 'delete', pages=pages)
+
+
+def insert_blank_pages(pdf_path, out, work_dir, session=None, after=0, count=1):
+    return _edit_pages(pdf_path, out, 'insert_blank', after=after, count=count)
+
+
+# ==========================
+# WORD → PDF
+# ==========================
+
+def word_to_pdf(doc_path, out, work_dir, session=None, image_dpi=docx_images.DEFAULT_DPI):
+    import mammoth
+
+    html_path = os.path.join(work_dir, "document.html")
+
+    # ==========================
+    # DOCX → HTML
+    # ==========================
+    # Images are deduplicated, downsampled and linked from the HTML instead of inlined
+    images = docx_images.ImageStore(doc_path, work_dir, dpi=image_dpi)
+    with open(doc_path, "rb") as docx_file:
+        result = mammoth.convert_to_html(docx_file, convert_image=mammoth.images.img_element(images))
+
+        html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <style>
+                @page {{
+                    size: A4;
+                    margin: 40px;
+                }}
+
+                body {{
+                    font-family: Arial, Helvetica, sans-serif;
+                    font-size: 12pt;
+                    line-height: 1.4;
+                }}
+
+                img {{
+                    max-width: 100%;
+                }}
+
+                table {{
+                    width: 100%;
+                    border-collapse: collapse;
+                }}
+
+                table, th, td {{
+                    border: 1px solid #444;
+                }}
+
+                th, td {{
+                    padding: 6px;
+                }}
+
+                /* Respect Word-style page breaks if present */
+                .page-break {{
+                    page-break-before: always;
+                }}
+            </style>
+        </head>
+        <body>
+            {result.value}
+        </body>
+        </html>
+        """
+
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        temp_storage.reserve_file(html_path)
+
+    # ==========================
+    # HTML → PDF (Chromium Print Engine)
+    # ==========================
+    _render_html_to_pdf(
+        html_path, out, session,
+        format="A4",
+        print_background=True,
+        margin={
+            "top": "40px",
+            "bottom": "40px",
+            "left": "40px",
+            "right": "40px"
+        }
+    )
+    return images.report()
+
+
+# ==========================
+# POWERPOINT → PDF
+# ==========================
+
+def pptx_to_pdf(ppt_path, out, work_dir, session=None):
+    from pptx import Presentation
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+    html_path = os.path.join(work_dir, "slides.html")
+    images_dir = os.path.join(work_dir, "images")
+    os.makedirs(images_dir, exist_ok=True)
+
+    prs = Presentation(ppt_path)
+    slide_blocks = []
+
+    # ==========================
+    # SLIDE PARSING
+    # ==========================
+    for slide_idx, slide in enumerate(prs.slides):
+        elements = []
+
+        for shape in slide.shapes:
+
+            # ---------- TEXT ----------
+            if shape.has_text_frame:
+                text = shape.text.strip()
+                if text:
+                    elements.append(f"<p class='text'>{text}</p>")
+
+            # ---------- IMAGES ----------
+            elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                image = shape.image
+                image_bytes = image.blob
+                image_ext = image.ext
+                image_name = f"slide{slide_idx}_{shape.shape_id}.{image_ext}"
+                image_path = os.path.join(images_dir, image_name)
+
+                with open(image_path, "wb") as img_file:
+                    img_file.write(image_bytes)
+                temp_storage.reserve_file(image_path)
+
+                elements.append(
+                    f"<img src='images/{image_name}' class='slide-image' />"
+                )
+
+            # ---------- CHARTS / SMARTART / EVERYTHING ELSE ----------
+            else:
+                # Ignore unsupported shapes safely
+                continue
+
+        slide_html = f"""
+        <section class="slide">
+            {''.join(elements)}
+        </section>
+        """
+        slide_blocks.append(slide_html)
+
+    # ==========================
+    # HTML TEMPLATE
+    # ==========================
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            @page {{
+                size: 16:9;
+                margin: 0;
+            }}
+
+            body {{
+                margin: 0;
+                font-family: Arial, Helvetica, sans-serif;
+                background: white;
+            }}
+
+            .slide {{
+                width: 960px;
+                height: 540px;
+                padding: 40px;
+                box-sizing: border-box;
+                page-break-after: always;
+                display: flex;
+                flex-direction: column;
+                gap: 12px;
+            }}
+
+            .text {{
+                font-size: 22px;
+            }}
+
+            .slide-image {{
+                max-width: 100%;
+                max-height: 320px;
+                object-fit: contain;
+            }}
+
+            .unsupported {{
+                margin-top: 20px;
+                padding: 10px;
+                border: 1px dashed red;
+                color: red;
+                font-size: 14px;
+            }}
+        </style>
+    </head>
+    <body>
+        {''.join(slide_blocks)}
+    </body>
+    </html>
+    """
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    temp_storage.reserve_file(html_path)
+
+    # ==========================
+    # HTML → PDF
+    # ==========================
+    _render_html_to_pdf(
+        html_path, out, session,
+        width="960px",
+        height="540px",
+        print_background=True
+    )
+
+
+# ==========================
+# EXCEL → PDF
+# ==========================
+
+def excel_to_pdf(excel_path, out, work_dir, session=None):
+    return _convert_table(excel_path, out, 'pdf')
+
+
+# ==========================
+# PDF COMPRESSOR
+# ==========================
+
+def compress_pdf(input_path, out, work_dir, session=None, mode='adaptive', target_kb=0):
+    # Target size: adaptive, with resolution and quality picked to fit the budget
+    if target_kb > 0:
+        return target_size.compress_pdf(input_path, out, work_dir, target_kb * 1024)
+
+    # Adaptive: only image-heavy pages are touched, see pdf_compress.py
+    if mode != 'raster':
+        return pdf_compress.compress_adaptive(input_path, out)
+
+    # Raster: every page is rendered to a JPEG
+    doc = fitz.open(input_path)
+    new_pdf = fitz.open()
+
+    try:
+        # Render each page as an image at lower DPI
+        for page in doc:
+            pix = page.get_pixmap(matrix=fitz.Matrix(1.2, 1.2))  # 1.5x reduces size a lot but keeps quality
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            img_io = io.BytesIO()
+            img.save(img_io, format="JPEG", optimize=True, quality=60)  # lower quality => smaller size
+
+            # Add new page to new PDF
+            rect = fitz.Rect(0, 0, pix.width, pix.height)
+            page_new = new_pdf.new_page(width=rect.width, height=rect.height)
+            page_new.insert_image(rect, stream=img_io.getvalue())
+
+        new_pdf.save(out, garbage=4, deflate=True)
+    finally:
+        new_pdf.close()
+        doc.close()
+
+
+# ==========================
+# IMAGE COMPRESSOR
+# ==========================
+
+def compress_image(img_path, out, work_dir, session=None, quality=60, target_kb=0):
+    img = Image.open(img_path)
+
+    # Handle transparency before saving as JPG
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+
+    # Target size: scale and quality picked from sampled tiles, see target_size.py
+    if target_kb > 0:
+        return target_size.compress_image(img, out, target_kb * 1024)
+
+    img.save(out, format='JPEG', optimize=True, quality=quality)
+
+
+# ==========================
+# TABULAR (CSV / JSON / XLSX)
+# ==========================
+
+# All tabular routes share one chunked, typed engine, see tabular.py
+
+def _convert_table(input_path, out, output_format):
+    try:
+        return tabular.convert(input_path, out, output_format)
+    except tabular.TableError as e:
+        raise ConversionError(str(e))
+
+
+def csv_to_xlsx(csv_path, out, work_dir, session=None):
+    return _convert_table(csv_path, out, 'xlsx')
+
+
+def csv_to_json(csv_path, out, work_dir, session=None):
+    return _convert_table(csv_path, out, 'json')
+
+
+def json_to_csv(json_path, out, work_dir, session=None):
+    return _convert_table(json_path, out, 'csv')
+
+
+def xlsx_to_csv(xlsx_path, out, work_dir, session=None):
+    return _convert_table(xlsx_path, out, 'csv')
+
+
+# ==========================
+# CONVERTER REGISTRY
+# ==========================
+
+DOC_WARNING = {'show_doc_warning': True}
+
+# Cost weights are rough seconds per unit; mostly their ratios matter
+weighted = cost_model.weighted
+
+registry.register(Converter(
+    'convert_images_to_pdf', '/convert-images', images_to_pdf,
+    input_types=IMAGE_TYPES,
+    download_name='convertigo.pdf', mimetype='application/pdf', as_attachment=False,
+    resource=CPU, multi_input=True,
+    estimate=weighted(cost_model.image_megapixels, 0.05),
+    empty_message="No images were uploaded.",
+    pages=[
+        Page('jpg_to_pdf', '/jpg-to-pdf', 'JPG to PDF', '.jpg'),
+        Page('jpeg_to_pdf', '/jpeg-to-pdf', 'JPEG to PDF', '.jpeg, .jpg'),
+        Page('png_to_pdf', '/png-to-pdf', 'PNG to PDF', '.png'),
+        Page('bmp_to_pdf', '/bmp-to-pdf', 'BMP to PDF', '.bmp'),
+        Page('tiff_to_pdf', '/tiff-to-pdf', 'TIFF to PDF', '.tiff, .tif'),
+        Page('webp_to_pdf', '/webp-to-pdf', 'WebP to PDF', '.webp'),
+        Page('heif_to_pdf', '/heif-to-pdf', 'HEIF to PDF', '.heif, .heic'),
+    ],
+))
+
+registry.register(Converter(
+    'merge_pdfs', '/merge', merge_pdfs,
+    input_types={'.pdf'},
+    download_name='merged.pdf', mimetype='application/pdf',
+    resource=IO, multi_input=True,
+    estimate=weighted(cost_model.pdf_pages, 0.005),
+    empty_message="No PDF uploaded.",
+    pages=[Page('merge_pdf', '/merge-pdf', 'Merge PDFs', '.pdf')],
+))
+
+registry.register(Converter(
+    'split_pdf_action', '/split', split_pdf,
+    input_types={'.pdf'},
+    download_name='split_pages.zip', mimetype='application/zip',
+    resource=IO, streaming=True,
+    estimate=weighted(cost_model.pdf_pages, 0.02),
+    empty_message="No PDF uploaded.",
+    pages=[Page('split_pdf', '/split-pdf', 'Split PDF', '.pdf')],
+))
+
+registry.register(Converter(
+    'rotate_pdf_action', '/rotate-pdf-action', rotate_pages,
+    input_types={'.pdf'},
+    download_name='rotated.pdf', mimetype='application/pdf',
+    resource=IO, options={'pages': (str, ''), 'angle': (int, 90)},
+    estimate=weighted(cost_model.pdf_pages, 0.001),
+    empty_message="No PDF uploaded.",
+    pages=[Page('rotate_pdf', '/rotate-pdf', 'Rotate PDF Pages', '.pdf')],
+))
+
+registry.register(Converter(
+    'reorder_pdf_action', '/reorder-pdf-action', reorder_pages,
+    input_types={'.pdf'},
+    download_name='reordered.pdf', mimetype='application/pdf',
+    resource=IO, options={'order': (str, '')},
+    estimate=weighted(cost_model.pdf_pages, 0.001),
+    empty_message="No PDF uploaded.",
+    pages=[Page('reorder_pdf', '/reorder-pdf', 'Reorder PDF Pages', '.pdf')],
+))
+
+registry.register(Converter(
+    'delete_pdf_pages_action', '/delete-pdf-pages-action', delete_pages,
+    input_types={'.pdf'},
+    download_name='edited.pdf', mimetype='application/pdf',
+    resource=IO, options={'pages': (str, '')},
+    estimate=weighted(cost_model.pdf_pages, 0.001),
+    empty_message="No PDF uploaded.",
+    pages=[Page('delete_pdf_pages', '/delete-pdf-pages', 'Delete PDF Pages', '.pdf')],
+))
+
+registry.register(Converter(
+    'insert_blank_pages_action', '/insert-blank-pages-action', insert_blank_pages,
+    input_types={'.pdf'},
+    download_name='edited.pdf', mimetype='application/pdf',
+    resource=IO, options={'after': (int, 0), 'count': (int, 1)},
+    estimate=weighted(cost_model.pdf_pages, 0.001),
+    empty_message="No PDF uploaded.",
+    pages=[Page('insert_blank_pages', '/insert-blank-pages', 'Insert Blank PDF Pages', '.pdf')],
+))
+
+registry.register(Converter(
+    'convert_word_to_pdf', '/convert-word', word_to_pdf,
+    input_types={'.docx'},
+    download_name='word_to_pdf.pdf', mimetype='application/pdf',
+    resource=BROWSER, open_session=BrowserSession,
+    options={'image_dpi': (int, docx_images.DEFAULT_DPI)},
+    estimate=weighted(cost_model.docx_megabytes, 1.0, base=1.5),
+    empty_message="No DOCX uploaded",
+    pages=[Page('word_to_pdf', '/word-to-pdf', 'Word to PDF', '.docx', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_excel_to_pdf', '/convert-excel', excel_to_pdf,
+    input_types={'.xlsx'},
+    download_name='excel_to_pdf.pdf', mimetype='application/pdf',
+    resource=CPU,
+    estimate=weighted(cost_model.xlsx_rows, 0.001),
+    empty_message="No XLSX uploaded",
+    pages=[Page('excel_to_pdf', '/excel-to-pdf', 'Excel to PDF', '.xlsx', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_pptx_to_pdf', '/convert-pptx', pptx_to_pdf,
+    input_types={'.pptx'},
+    download_name='pptx_to_pdf.pdf', mimetype='application/pdf',
+    resource=BROWSER, open_session=BrowserSession,
+    estimate=weighted(cost_model.pptx_slides, 0.1, base=1.5),
+    empty_message="No PPTX uploaded",
+    pages=[Page('pptx_to_pdf', '/pptx-to-pdf', 'PPTX to PDF', '.pptx', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_heic_to_pdf', '/convert-heic-to-pdf', heic_to_pdf,
+    input_types={'.heic', '.heif'},
+    download_name='converted_heic.pdf', mimetype='application/pdf',
+    resource=CPU, multi_input=True,
+    estimate=weighted(cost_model.image_megapixels, 0.1),
+    empty_message="No HEIC uploaded.",
+    pages=[Page('heic_to_pdf_page', '/heic-to-pdf', 'HEIC to PDF', '.heic,.heif')],
+))
+
+registry.register(Converter(
+    'convert_zip_to_pdf', '/convert-zip-to-pdf', zip_to_pdf,
+    input_types={'.zip'},
+    download_name='zip_to_pdf.pdf', mimetype='application/pdf',
+    resource=CPU,
+    estimate=weighted(cost_model.zip_image_megabytes, 0.1),
+    empty_message="No ZIP file uploaded.",
+    pages=[Page('zip_to_pdf', '/zip-to-pdf', 'ZIP (Images) to PDF', '.zip')],
+))
+
+registry.register(Converter(
+    'compress_pdf_action', '/compress-pdf-action', compress_pdf,
+    input_types={'.pdf'},
+    download_name='compressed.pdf', mimetype='application/pdf',
+    resource=CPU, options={'mode': (str, 'adaptive'), 'target_kb': (int, 0)},
+    estimate=weighted(cost_model.pdf_pages, 0.15),
+    empty_message="No valid PDF uploaded",
+    pages=[Page('compress_pdf_page', '/compress-pdf', 'Compress PDF', '.pdf')],
+))
+
+registry.register(Converter(
+    'compress_image_action', '/compress-image-action', compress_image,
+    input_types={'.jpg', '.jpeg', '.png', '.webp'},
+    download_name='compressed_image.jpg', mimetype='image/jpeg',
+    resource=CPU, options={'quality': (int, 60), 'target_kb': (int, 0)},
+    estimate=weighted(cost_model.image_megapixels, 0.05),
+    empty_message="No image uploaded.",
+    pages=[Page('compress_image_page', '/compress-image', 'Compress Image', '.jpg,.jpeg,.png,.webp')],
+))
+
+registry.register(Converter(
+    'convert_csv_to_xlsx', '/convert-csv-to-xlsx', csv_to_xlsx,
+    input_types={'.csv'},
+    download_name='converted.xlsx',
+    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    resource=CPU,
+    estimate=weighted(cost_model.csv_rows, 0.0002),
+    empty_message="No CSV file uploaded",
+    pages=[Page('csv_to_xlsx_page', '/csv-to-xlsx', 'CSV to XLSX', '.csv', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_json_to_csv', '/convert-json-to-csv', json_to_csv,
+    input_types={'.json', '.ndjson', '.jsonl'},
+    download_name='converted.csv', mimetype='text/csv',
+    resource=IO, streaming=True,
+    estimate=weighted(cost_model.file_megabytes, 0.2),
+    empty_message="No JSON file uploaded",
+    pages=[Page('json_to_csv', '/json-to-csv', 'JSON to CSV', '.json,.ndjson,.jsonl', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_csv_to_json', '/convert-csv-to-json', csv_to_json,
+    input_types={'.csv'},
+    download_name='converted.json', mimetype='application/json',
+    resource=IO, streaming=True,
+    estimate=weighted(cost_model.csv_rows, 0.0001),
+    empty_message="No CSV file uploaded",
+    pages=[Page('csv_to_json', '/csv-to-json', 'CSV to JSON', '.csv', **DOC_WARNING)],
+))
+
+registry.register(Converter(
+    'convert_xlsx_to_csv', '/convert-xlsx-to-csv', xlsx_to_csv,
+    input_types={'.xlsx'},
+    download_name='converted.csv', mimetype='text/csv',
+    resource=IO, streaming=True,
+    estimate=weighted(cost_model.xlsx_rows, 0.0002),
+    empty_message="No XLSX file uploaded",
+    pages=[Page('xlsx_to_csv', '/xlsx-to-csv', 'XLSX to CSV', '.xlsx', **DOC_WARNING)],
+))
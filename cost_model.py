@@ -0,0 +1,131 @@
+import os
+import re
+import zipfile
+
+import fitz
+from PIL import Image
+
+# Cheap, header-only cost estimates used by the scheduler to run small jobs
+# first. Nothing here decodes pixels or parses document bodies; each
+# estimator looks at the xref, image headers or the ZIP central directory.
+#
+# Costs are in rough "seconds of work" units so that converters can be
+# compared with each other.
+
+DEFAULT_COST_PER_MB = 0.05
+MIN_COST = 0.05
+
+_SLIDE_RE = re.compile(r'^ppt/slides/slide\d+\.xml$')
+_DIMENSION_RE = re.compile(rb'<dimension ref="[A-Z]+\d+(?::[A-Z]+(\d+))?"')
+
+
+def _megabytes(path):
+    return os.path.getsize(path) / (1024 * 1024)
+
+
+def file_megabytes(paths):
+    return sum(_megabytes(p) for p in paths)
+
+
+def pdf_pages(paths):
+    """Page count, read from the xref / page tree only."""
+    pages = 0
+    for path in paths:
+        with fitz.open(path) as doc:
+            pages += doc.page_count
+    return pages
+
+
+def image_megapixels(paths):
+    """Pixel count from image headers (PIL opens lazily)."""
+    total = 0
+    for path in paths:
+        with Image.open(path) as img:
+            width, height = img.size
+            total += width * height * getattr(img, 'n_frames', 1)
+    return total / 1_000_000
+
+
+def zip_image_megabytes(paths):
+    """Uncompressed size of the images in an archive, from the central directory."""
+    import zip_handler
+
+    total = 0
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            total += sum(
+                info.file_size for info in zf.infolist()
+                if os.path.splitext(info.filename.lower())[1] in zip_handler.ZIP_IMAGE_EXTENSIONS
+            )
+    return total / (1024 * 1024)
+
+
+def pptx_slides(paths):
+    """Slide count, from the names in the package's central directory."""
+    slides = 0
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            slides += sum(1 for name in zf.namelist() if _SLIDE_RE.match(name))
+    return slides
+
+
+def docx_megabytes(paths):
+    """Uncompressed size of the document body and its media."""
+    total = 0
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            total += sum(
+                info.file_size for info in zf.infolist()
+                if info.filename == 'word/document.xml' or info.filename.startswith('word/media/')
+            )
+    return total / (1024 * 1024)
+
+
+def xlsx_rows(paths):
+    """Row count of each workbook's first sheet, from its <dimension> element."""
+    rows = 0
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            sheets = sorted(n for n in zf.namelist() if n.startswith('xl/worksheets/sheet'))
+            if not sheets:
+                continue
+            with zf.open(sheets[0]) as f:
+                head = f.read(4096)
+            match = _DIMENSION_RE.search(head)
+            if match and match.group(1):
+                rows += int(match.group(1))
+            else:
+                # No dimension recorded: fall back to the sheet's size
+                rows += zf.getinfo(sheets[0]).file_size // 200
+    return rows
+
+
+def csv_rows(paths, sample_bytes=64 * 1024):
+    """Row count extrapolated from the average line length of the first block."""
+    rows = 0
+    for path in paths:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            sample = f.read(sample_bytes)
+        lines = sample.count(b'\n') or 1
+        rows += int(size / (len(sample) / lines)) if sample else 0
+    return rows
+
+
+def weighted(measure, per_unit, base=0.1):
+    """
+    Builds an estimator: ``base + measure(paths) * per_unit``.
+    Falls back to the input size when the measure can't read a file.
+    """
+    def estimate(paths):
+        try:
+            return max(MIN_COST, base + measure(paths) * per_unit)
+        except Exception as e:
+            print(f"Cost estimate failed ({measure.__name__}): {e}")
+            return default_estimate(paths)
+    estimate.__name__ = f'{measure.__name__}_cost'
+    return estimate
+
+
+def default_estimate(paths):
+    return max(MIN_COST, file_megabytes(paths) * DEFAULT_COST_PER_MB)
@@ -0,0 +1,443 @@
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+import traceback
+
+from flask import after_this_request, render_template, request, send_file, url_for
+
+import batch
+import file_handler
+import job_reports
+import output_sink
+import profiling
+import registry
+import result_cache
+import temp_storage
+from converters import ConversionError
+from registry import BROWSER, CPU, IO
+from scheduler import Busy, ClassScheduler
+
+# ==========================
+# SCHEDULERS & ADMISSION CONTROL
+# ==========================
+
+# Threads per resource class, and how many jobs may wait for one
+# (per worker process; each gunicorn worker has its own schedulers)
+EXECUTOR_WORKERS = {
+    CPU: os.cpu_count() or 1,
+    BROWSER: 2,
+    IO: 8,
+}
+MAX_QUEUED = {
+    CPU: 32,
+    BROWSER: 8,
+    IO: 64,
+}
+RETRY_AFTER_SECONDS = 5
+PIPE_CHUNKS = 16  # streamed chunks held in memory; the rest waits in the workspace
+
+# Jobs are ordered by estimated cost (shortest first, with aging), see scheduler.py
+_schedulers = {
+    resource: ClassScheduler(resource, n, MAX_QUEUED[resource])
+    for resource, n in EXECUTOR_WORKERS.items()
+}
+_lock = threading.Lock()
+_thread_sessions = threading.local()
+
+
+def _session_for(converter):
+    """
+    Scheduler threads keep one session per factory (e.g. one Chromium per
+    browser thread), so setup is paid once per thread instead of per request.
+    """
+    if converter.open_session is None:
+        return None
+    sessions = getattr(_thread_sessions, 'sessions', None)
+    if sessions is None:
+        sessions = _thread_sessions.sessions = {}
+    if converter.open_session not in sessions:
+        sessions[converter.open_session] = converter.open_session()
+    return sessions[converter.open_session]
+
+
+def _drop_session(converter):
+    """Throws away a session after a failure so the next job starts clean."""
+    sessions = getattr(_thread_sessions, 'sessions', {})
+    session = sessions.pop(converter.open_session, None)
+    if session is not None:
+        try:
+            session.close()
+        except Exception as e:
+            print("Session close warning:", e)
+
+
+def submit(resource, fn, *args, cost=1.0, **kwargs):
+    """
+    Queues ``fn`` on the scheduler of ``resource``. Raises Busy instead of
+    queueing without bound.
+
+    Returns:
+        concurrent.futures.Future
+    """
+    return _schedulers[resource].submit(fn, *args, cost=cost, **kwargs)
+
+
+# ==========================
+# INSTRUMENTATION
+# ==========================
+
+_metrics = {}
+
+
+def _record(converter, **values):
+    with _lock:
+        m = _metrics.setdefault(converter.endpoint, {
+            'requests': 0, 'errors': 0, 'client_errors': 0, 'rejected': 0,
+            'cache_hits': 0, 'batches': 0, 'profiled': 0, 'bytes_in': 0, 'bytes_out': 0,
+            'cost_estimated': 0.0, 'seconds_total': 0.0, 'seconds_max': 0.0,
+        })
+        for key, value in values.items():
+            if key == 'seconds':
+                m['seconds_total'] += value
+                m['seconds_max'] = max(m['seconds_max'], value)
+            else:
+                m[key] += value
+
+
+def metrics():
+    with _lock:
+        data = {name: dict(values) for name, values in _metrics.items()}
+    return {
+        'converters': data,
+        'schedulers': {resource: sched.stats() for resource, sched in _schedulers.items()},
+        'result_cache': result_cache.stats(),
+    }
+
+
+# ==========================
+# STREAMING PIPE
+# ==========================
+
+_DONE = object()
+
+
+class _PipeWriter:
+    """
+    File-like object that hands written chunks to the response generator.
+
+    Up to PIPE_CHUNKS chunks wait in memory. When the client reads slower
+    than the converter writes, the rest goes to a file in the request
+    workspace (charged to its quota), which the generator reads after the
+    memory chunks. Writes never wait for the client, so a slow download
+    doesn't hold on to the scheduler slot.
+    """
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.cancelled = False
+        self._cond = threading.Condition()
+        self._memory = collections.deque()
+        self._end = None  # _DONE or the converter's exception
+        self._spill = None  # writer side of the spill file
+        self._spill_path = None
+        self._spill_written = 0
+        self._reader = None
+        self._spill_read = 0
+
+    # --- converter side (scheduler thread) ---
+
+    def write(self, data):
+        data = bytes(data)
+        with self._cond:
+            if self.cancelled:
+                raise ConnectionAbortedError("Client went away.")
+            # Once spilling, everything goes to the file so chunks stay in order
+            if self._spill is None and len(self._memory) < PIPE_CHUNKS:
+                self._memory.append(data)
+                self._cond.notify()
+                return len(data)
+        if self._spill is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix='.pipe-', dir=self.workspace.path)
+            self._spill = os.fdopen(fd, 'wb')
+        self.workspace.reserve(len(data))
+        self._spill.write(data)
+        self._spill.flush()
+        with self._cond:
+            self._spill_written += len(data)
+            self._cond.notify()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def finish(self, error=None):
+        if self._spill is not None:
+            self._spill.close()
+        with self._cond:
+            self._end = _DONE if error is None else error
+            self._cond.notify()
+
+    # --- client side (response generator) ---
+
+    def next_chunk(self):
+        """
+        Returns:
+            bytes, _DONE, or the exception the converter raised
+        """
+        with self._cond:
+            while True:
+                if self._memory:
+                    return self._memory.popleft()
+                if self._spill_read < self._spill_written:
+                    size = min(output_sink.CHUNK_SIZE, self._spill_written - self._spill_read)
+                    break
+                if self._end is not None:
+                    return self._end
+                self._cond.wait()
+        if self._reader is None:
+            self._reader = open(self._spill_path, 'rb')
+        data = self._reader.read(size)
+        self._spill_read += len(data)
+        return data
+
+    def close(self):
+        with self._cond:
+            self.cancelled = True
+        if self._reader is not None:
+            self._reader.close()
+
+
+def _iter_pipe(pipe, first):
+    try:
+        item = first
+        while item is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+            item = pipe.next_chunk()
+    finally:
+        pipe.close()
+
+
+# ==========================
+# DISPATCH
+# ==========================
+
+def _run(converter, inputs, out, work_dir, options):
+    session = _session_for(converter)
+    try:
+        return converter.convert(inputs, out, work_dir, session=session, **options)
+    except Exception:
+        if session is not None:
+            _drop_session(converter)
+        raise
+
+
+def _run_streaming(converter, inputs, pipe, work_dir, options):
+    try:
+        _run(converter, inputs, pipe, work_dir, options)
+    except BaseException as e:
+        pipe.finish(e)
+    else:
+        pipe.finish()
+
+
+def _run_batch_item(converter, *args):
+    # One file of a batch, in its own scheduler slot with the thread's session
+    session = _session_for(converter)
+    entry = batch.convert_one(converter.convert, *args, session=session)
+    if session is not None and entry['status'] == 'error':
+        _drop_session(converter)
+    return entry
+
+
+def _with_report(response, report, job_id):
+    """
+    Attaches what the converter reported (decisions, savings...) as a header.
+    The header gets a bounded summary; when that leaves out detail, the full
+    report is stored and the summary links to it.
+    """
+    if report:
+        summary = job_reports.summarize(report)
+        if summary != report:
+            try:
+                job_reports.save(job_id, report)
+                summary['detail'] = url_for('job_report', job_id=job_id)
+            except OSError as e:
+                print(f"Report {job_id} not saved: {e}")
+        response.headers['X-Conversion-Report'] = json.dumps(summary, separators=(',', ':'))
+    return response
+
+
+def _send(converter, sink, job_id, report=None):
+    response = sink.send(download_name=converter.download_name, mimetype=converter.mimetype,
+                         as_attachment=converter.as_attachment)
+    return _with_report(response, report, job_id)
+
+
+# The cache only saves work: when it fails, the request converts as usual
+
+def _send_cached(converter, key, job_id):
+    """Returns the cached response for ``key``, or None on a miss."""
+    cached, report = result_cache.get(key)
+    if cached is None:
+        return None
+    try:
+        size = os.fstat(cached.fileno()).st_size
+    except OSError as e:
+        cached.close()
+        print(f"Result cache read skipped: {e}")
+        return None
+    response = send_file(cached, download_name=converter.download_name,
+                         mimetype=converter.mimetype, as_attachment=converter.as_attachment)
+    response.content_length = size
+    return _with_report(response, report, job_id)
+
+
+def _remember(key, sink, report):
+    try:
+        result_cache.put(key, sink, report)
+    except OSError as e:
+        print(f"Result cache write skipped: {e}")
+
+
+def handle(converter):
+    """The single POST handler behind every registered converter."""
+    started = time.perf_counter()
+    temp_dir, paths = file_handler.save_uploaded_files(request)
+    workspace = temp_storage.request_workspace(request)
+
+    paths = [p for p in paths if converter.accepts(p)]
+    if not paths:
+        _record(converter, requests=1, client_errors=1)
+        return converter.empty_message, 400
+
+    options = converter.parse_options(request.form)
+    inputs = paths if converter.multi_input else paths[0]
+    # Header-only estimate (pages, pixels, slides, rows) used to run small jobs first
+    cost = converter.estimate(paths)
+    _record(converter, requests=1, bytes_in=sum(os.path.getsize(p) for p in paths),
+            cost_estimated=cost)
+
+    # Every job gets an ID; opt-in profiles are stored under it
+    job_id = profiling.new_job_id()
+    run, run_batch_item, run_streaming = _run, _run_batch_item, _run_streaming
+    trigger = profiling.requested(request)
+    if trigger:
+        capture = profiling.Capture(job_id, converter.endpoint, trigger, details={
+            'inputs': [(os.path.basename(p), os.path.getsize(p)) for p in paths],
+            'options': options,
+            'cost_estimate': cost,
+        })
+        # A batch is profiled through its first file
+        run, run_batch_item, run_streaming = (capture.wrap(_run), capture.wrap(_run_batch_item),
+                                              capture.wrap(_run_streaming))
+        _record(converter, profiled=1)
+
+    @after_this_request
+    def tag_job(response):
+        response.headers['X-Job-Id'] = job_id
+        return response
+
+    try:
+        # --- Several files for a one-file converter: run as a batch ---
+        if not converter.multi_input and len(paths) > 1:
+            if len(paths) > batch.MAX_BATCH_FILES:
+                _record(converter, client_errors=1)
+                return f"Too many files: a batch is limited to {batch.MAX_BATCH_FILES}.", 400
+
+            def submit_file(index, path, *args):
+                fn = run_batch_item if index == 0 else _run_batch_item
+                return submit(converter.resource, fn, converter, path, *args,
+                              cost=converter.estimate([path]))
+
+            manifest = batch.run_batch(submit_file, paths, converter.output_ext, workspace, options,
+                                       max_running=EXECUTOR_WORKERS[converter.resource])
+            _record(converter, batches=1, seconds=time.perf_counter() - started)
+            stem = os.path.splitext(converter.download_name)[0]
+            return batch.send_manifest_zip(manifest, workspace, download_name=f"{stem}.zip")
+
+        # --- Streaming: pipe chunks to the client while the converter runs ---
+        if converter.streaming:
+            pipe = _PipeWriter(workspace)
+            submit(converter.resource, run_streaming, converter, inputs, pipe, temp_dir, options, cost=cost)
+            # Wait for the first chunk so early failures still get a proper status
+            first = pipe.next_chunk()
+            if isinstance(first, BaseException):
+                pipe.close()
+                raise first
+            _record(converter, seconds=time.perf_counter() - started)
+            return output_sink.stream_response(
+                _iter_pipe(pipe, first),
+                download_name=converter.download_name,
+                mimetype=converter.mimetype,
+                as_attachment=converter.as_attachment
+            )
+
+        # --- Buffered: check the cache, convert into a sink, remember the result ---
+        cache_key = None
+        if converter.cacheable:
+            cache_key = result_cache.key_for(converter.endpoint, paths, options)
+            # A profiled request has to convert, or there'd be nothing to capture
+            response = _send_cached(converter, cache_key, job_id) if not trigger else None
+            if response is not None:
+                _record(converter, cache_hits=1, seconds=time.perf_counter() - started)
+                return response
+
+        sink = output_sink.OutputSink(workspace, 'output' + converter.output_ext)
+        report = submit(converter.resource, run, converter, inputs, sink, temp_dir, options,
+                        cost=cost).result()
+        if cache_key:
+            _remember(cache_key, sink, report)
+
+        _record(converter, bytes_out=sink.size, seconds=time.perf_counter() - started)
+        return _send(converter, sink, job_id, report)
+
+    except Busy:
+        _record(converter, rejected=1)
+        return "Server is busy, please retry shortly.", 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+    except ConversionError as e:
+        _record(converter, client_errors=1)
+        return str(e), 400
+    except temp_storage.QuotaExceeded:
+        raise
+    except Exception as e:
+        _record(converter, errors=1)
+        traceback.print_exc()
+        return f"Conversion failed: {e}", 500
+
+
+# ==========================
+# ROUTE INSTALLATION
+# ==========================
+
+def _page_view(converter, page):
+    def view():
+        return render_template(
+            'converter_page.html',
+            title=page.title,
+            file_accept=page.file_accept,
+            upload_endpoint=url_for(converter.endpoint),
+            show_doc_warning=page.show_doc_warning
+        )
+    view.__name__ = page.endpoint
+    return view
+
+
+def _action_view(converter):
+    def view():
+        return handle(converter)
+    view.__name__ = converter.endpoint
+    return view
+
+
+def install(app):
+    """Adds the page and action routes of every registered converter to ``app``."""
+    for converter in registry.CONVERTERS.values():
+        app.add_url_rule(converter.path, endpoint=converter.endpoint,
+                         view_func=_action_view(converter), methods=['POST'])
+        for page in converter.pages:
+            app.add_url_rule(page.path, endpoint=page.endpoint, view_func=_page_view(converter, page))
@@ -0,0 +1,178 @@
+import hashlib
+import io
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageOps
+
+import temp_storage
+
+# Image handling for DOCX → HTML (mammoth).
+#
+# mammoth inlines every image as a base64 data URI at its original
+# resolution, so documents full of pasted screenshots turn into huge HTML
+# strings that Chromium has to parse, decode and embed as-is. Instead, each
+# distinct image (by SHA-256) is written once next to the HTML file,
+# downsampled to the size it is printed at, and referenced by file name.
+
+DEFAULT_DPI = 150
+MIN_DPI, MAX_DPI = 72, 600
+PRINTABLE_WIDTH_IN = (794 - 2 * 40) / 96   # A4 minus the 40px margins used by word_to_pdf
+RESIZE_SLACK = 1.1    # leave images alone when they are barely above the target
+JPEG_QUALITY = 85
+EMU_PER_INCH = 914400
+
+_NS = {
+    'wp': 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+_EXTENT = f"{{{_NS['wp']}}}extent"
+_BLIP = f"{{{_NS['a']}}}blip"
+_EMBED = f"{{{_NS['r']}}}embed"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def printed_sizes(doc_path):
+    """
+    Reads how large each embedded image is drawn in the document body,
+    from the <wp:extent> of every drawing.
+
+    Returns:
+        dict: image SHA-256 -> set of (width_in, height_in), one per distinct use
+    """
+    sizes = {}
+    with zipfile.ZipFile(doc_path) as zf:
+        try:
+            rels = ET.fromstring(zf.read('word/_rels/document.xml.rels'))
+        except KeyError:
+            return sizes
+        targets = {
+            rel.get('Id'): posixpath.normpath(posixpath.join('word', rel.get('Target', '')))
+            for rel in rels.iter(f"{{{_NS['rel']}}}Relationship")
+        }
+
+        extent = None
+        by_member = {}
+        with zf.open('word/document.xml') as f:
+            for _, element in ET.iterparse(f, events=('start',)):
+                if element.tag == _EXTENT:
+                    extent = (int(element.get('cx', 0)) / EMU_PER_INCH,
+                              int(element.get('cy', 0)) / EMU_PER_INCH)
+                elif element.tag == _BLIP and extent and element.get(_EMBED) in targets:
+                    member = targets[element.get(_EMBED)]
+                    by_member.setdefault(member, set()).add((round(extent[0], 2), round(extent[1], 2)))
+
+        # Identical images stored under several names are one image
+        for member, extents in by_member.items():
+            try:
+                sizes.setdefault(_sha256(zf.read(member)), set()).update(extents)
+            except KeyError:
+                continue
+    return sizes
+
+
+class ImageStore:
+    """
+    A mammoth image converter that writes deduplicated, downsampled images
+    to ``image_dir`` and returns ``src`` references relative to the HTML.
+
+    Usage:
+        store = ImageStore(doc_path, work_dir, dpi)
+        mammoth.convert_to_html(f, convert_image=mammoth.images.img_element(store))
+    """
+
+    def __init__(self, doc_path, work_dir, dpi=DEFAULT_DPI, folder='images'):
+        self.dpi = min(max(dpi, MIN_DPI), MAX_DPI)
+        self.folder = folder
+        self.image_dir = os.path.join(work_dir, folder)
+        os.makedirs(self.image_dir, exist_ok=True)
+        self.sizes = printed_sizes(doc_path)
+        self._written = {}  # SHA-256 -> img attributes
+        self.stats = {'images': 0, 'unique_images': 0, 'resized': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    def __call__(self, image):
+        with image.open() as f:
+            data = f.read()
+        digest = _sha256(data)
+        self.stats['images'] += 1
+
+        if digest not in self._written:
+            self._written[digest] = self._store(digest, data, image.content_type)
+        return dict(self._written[digest])
+
+    def _store(self, digest, data, content_type):
+        self.stats['unique_images'] += 1
+        self.stats['bytes_in'] += len(data)
+
+        extents = self.sizes.get(digest)
+        # Not drawn anywhere we could see: assume it may span the page width
+        max_width_in = PRINTABLE_WIDTH_IN
+        if extents:
+            max_width_in = min(max(width for width, _ in extents), PRINTABLE_WIDTH_IN)
+
+        ext = '.' + (content_type.split('/')[-1] or 'bin')
+        try:
+            data, ext = self._downsample(data, max_width_in)
+        except Exception as e:
+            # EMF/WMF and friends: Chromium gets the original bytes, as before
+            print(f"Keeping image {digest[:12]} as is: {e}")
+
+        name = digest[:16] + ext
+        path = os.path.join(self.image_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        temp_storage.reserve_file(path)
+        self.stats['bytes_out'] += len(data)
+
+        attributes = {'src': f"{self.folder}/{name}"}
+        if extents and len(extents) == 1:
+            # Draw it as large as Word does; the stylesheet still caps it at the page width.
+            # Images used at several sizes keep their natural size, as before.
+            (width, _), = extents
+            if width:
+                attributes['style'] = f"width: {width:.2f}in"
+        return attributes
+
+    def _downsample(self, data, max_width_in):
+        """
+        Returns:
+            tuple: (bytes, extension), the original bytes when re-encoding doesn't pay off
+        """
+        img = Image.open(io.BytesIO(data))
+        is_jpeg = img.format == 'JPEG'
+        ext = '.jpg' if is_jpeg else '.png'
+
+        target_width = max(1, int(max_width_in * self.dpi))
+        if img.width <= target_width * RESIZE_SLACK:
+            if img.format in ('JPEG', 'PNG', 'GIF', 'WEBP'):
+                return data, '.' + img.format.lower().replace('jpeg', 'jpg')
+            target_width = img.width  # only re-encode formats Chromium may not show
+
+        # EXIF orientation is lost when re-encoding, so apply it first
+        img = ImageOps.exif_transpose(img)
+        if img.width > target_width:
+            target_height = max(1, round(img.height * target_width / img.width))
+            img = img.resize((target_width, target_height), Image.LANCZOS)
+            self.stats['resized'] += 1
+
+        buffer = io.BytesIO()
+        if is_jpeg:
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.save(buffer, format='JPEG', optimize=True, quality=JPEG_QUALITY)
+        else:
+            # Screenshots and drawings: lossless keeps text crisp
+            if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+                img = img.convert('RGBA')
+            img.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue(), ext
+
+    def report(self):
+        return dict(self.stats, dpi=self.dpi)
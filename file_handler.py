@@ -1,7 +1,8 @@
 import os
-import tempfile
 from werkzeug.utils import secure_filename
 
+import temp_storage
+
 # You can adjust this per converter type if you want
 
 ALLOWED_EXTENSIONS = {
@@ -15,7 +16,7 @@ ALLOWED_EXTENSIONS = {
     # === ADD THESE ===
     '.zip',
     '.csv',
-    '.json'
+    '.json', '.ndjson', '.jsonl'
 }
 
 
@@ -30,12 +31,17 @@ def allowed_file(filename):
 def save_uploaded_files(request):
     """
     Saves uploaded files from Flask request.files['images'] (or other fields)
-    into a temporary directory.
+    into a per-request workspace. The workspace is removed automatically
+    once the response has been sent.
+
+    Raises:
+        temp_storage.QuotaExceeded: if the uploads don't fit the workspace quota
 
     Returns:
         tuple: (temp_dir, saved_filepaths)
     """
-    temp_dir = tempfile.mkdtemp()
+    workspace = temp_storage.request_workspace(request)
+    temp_dir = workspace.path
     saved_filepaths = []
 
     uploaded_files = []
@@ -60,12 +66,15 @@ def save_uploaded_files(request):
 
         # Limit file size before writing to disk
         file.seek(0, os.SEEK_END)
-        size_mb = file.tell() / (1024 * 1024)
+        size_bytes = file.tell()
+        size_mb = size_bytes / (1024 * 1024)
         file.seek(0)
         if size_mb > MAX_FILE_SIZE_MB:
             print(f"File too large ({size_mb:.2f} MB): {filename}")
             continue
 
+        workspace.reserve(size_bytes)
+
         full_path = os.path.join(temp_dir, filename)
         try:
             file.save(full_path)
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+
+import temp_storage
+
+# What a converter reports (decisions, savings...) goes back to the client in
+# the X-Conversion-Report header. Headers have to stay small (proxies reject
+# large ones), so the header carries a bounded summary; when that drops
+# detail, the full report is kept here under the request's job ID and served
+# by /reports/<job_id>. Batch manifests always carry the full reports.
+
+# Shared by all workers, so any of them can serve every report
+REPORT_DIR = os.path.join(temp_storage.SCRATCH_ROOT, 'papermill_reports')
+MAX_REPORTS = 500
+MAX_SUMMARY_CHARS = 64  # longest string value kept in the header
+
+
+def run_length(text):
+    """'KKKDR' -> '3K1D1R'"""
+    runs = []
+    for char in text:
+        if runs and runs[-1][1] == char:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, char])
+    return ''.join(f"{count}{char}" for count, char in runs)
+
+
+def _shorten(text):
+    """Cuts a run-length string at a run boundary."""
+    if len(text) <= MAX_SUMMARY_CHARS:
+        return text
+    cut = text[:MAX_SUMMARY_CHARS]
+    while cut and cut[-1].isdigit():
+        cut = cut[:-1]
+    return cut + '...'
+
+
+def summarize(report):
+    """
+    Bounded version of ``report`` for the response header.
+
+    Long strings (per-page decisions) are run-length encoded into
+    ``<key>_rle`` and cut if still too long. Dicts and lists (per-page
+    savings) become ``<key>_count`` and, when numeric, ``<key>_total``.
+
+    Returns:
+        dict: the summary; equal to ``report`` when nothing had to change
+    """
+    summary = {}
+    for key, value in report.items():
+        if isinstance(value, str) and len(value) > MAX_SUMMARY_CHARS:
+            summary[key + '_rle'] = _shorten(run_length(value))
+        elif isinstance(value, (dict, list, tuple)):
+            values = list(value.values()) if isinstance(value, dict) else list(value)
+            summary[key + '_count'] = len(values)
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                summary[key + '_total'] = sum(values)
+        else:
+            summary[key] = value
+    return summary
+
+
+def _path(job_id):
+    if not job_id.isalnum():
+        raise KeyError(job_id)
+    return os.path.join(REPORT_DIR, job_id + '.json')
+
+
+def save(job_id, report):
+    """Stores the full report, keeping the newest MAX_REPORTS."""
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=job_id + '.', suffix='.tmp', dir=REPORT_DIR)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        os.replace(tmp, _path(job_id))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _evict()
+
+
+def _evict():
+    try:
+        entries = [e for e in os.scandir(REPORT_DIR) if e.name.endswith('.json')]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[MAX_REPORTS:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def load(job_id):
+    """
+    Raises:
+        KeyError: unknown job ID
+
+    Returns:
+        dict: the full report
+    """
+    try:
+        with open(_path(job_id), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise KeyError(job_id)
@@ -0,0 +1,230 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+
+from flask import Response, request, send_file, stream_with_context
+
+import temp_storage
+
+# Outputs bigger than this are moved from memory to the request workspace
+SPILL_THRESHOLD_MB = 8
+CHUNK_SIZE = 64 * 1024
+
+
+# ==========================
+# BUFFERED SINK (spills to disk)
+# ==========================
+
+class OutputSink:
+    """
+    File-like object converters write their result into.
+
+    Small outputs stay in memory. Once the output grows past the threshold
+    it is moved to a file in the request workspace, so RAM use stays flat
+    no matter how large the result is. Either way ``send()`` produces a
+    response with Content-Length and range-request support.
+
+    The file shares the workspace with the uploads, so it gets a unique
+    dot-prefixed name: secure_filename() never lets an upload start with
+    a dot, and an upload named like ``filename`` is never overwritten.
+    """
+
+    def __init__(self, workspace, filename, threshold_mb=None):
+        self.workspace = workspace
+        fd, self.path = tempfile.mkstemp(prefix='.sink-', suffix='-' + filename, dir=workspace.path)
+        os.close(fd)
+        if threshold_mb is None:
+            threshold_mb = SPILL_THRESHOLD_MB
+        self.threshold = threshold_mb * 1024 * 1024
+        self.spilled = False
+        self._file = io.BytesIO()
+        self._size = 0
+
+    # --- file protocol used by PIL, fitz, PyPDF2, reportlab, openpyxl ---
+
+    def write(self, data):
+        end = self._file.tell() + len(data)
+        if not self.spilled and end > self.threshold:
+            self._spill()
+        if end > self._size:
+            if self.spilled:
+                self.workspace.reserve(end - self._size)
+            self._size = end
+        return self._file.write(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def getvalue(self):
+        # PIL's PDF writer reads back what is already there before appending
+        if not self.spilled:
+            return self._file.getvalue()
+        position = self._file.tell()
+        self._file.seek(0)
+        data = self._file.read()
+        self._file.seek(position)
+        return data
+
+    def truncate(self, size=None):
+        return self._file.truncate(size)
+
+    def flush(self):
+        self._file.flush()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def _spill(self):
+        buffered = self._file.getbuffer()
+        self.workspace.reserve(len(buffered))
+        position = self._file.tell()
+
+        disk = open(self.path, 'w+b')
+        disk.write(buffered)
+        disk.seek(position)
+        del buffered
+
+        self._file.close()
+        self._file = disk
+        self.spilled = True
+
+    @property
+    def size(self):
+        return self._size
+
+    def adopt(self, path):
+        """
+        Takes over a finished file from the same workspace as the output,
+        without copying it. Only possible while nothing has been written.
+
+        Returns:
+            bool: False when the caller has to copy the file instead
+        """
+        if self._size or self.spilled:
+            return False
+        try:
+            os.replace(path, self.path)
+        except OSError:
+            return False
+
+        self._file.close()
+        self._file = open(self.path, 'r+b')
+        self._size = self._file.seek(0, os.SEEK_END)
+        self.spilled = True
+        return True
+
+    def copy_to(self, path):
+        """Writes the current output to ``path`` (used by the result cache)."""
+        position = self._file.tell()
+        self._file.seek(0)
+        with open(path, 'wb') as dst:
+            shutil.copyfileobj(self._file, dst, CHUNK_SIZE)
+        self._file.seek(position)
+
+    def send(self, download_name, mimetype, as_attachment=True):
+        """Finishes the output and turns it into a Flask response."""
+        if self.spilled:
+            # Served from disk: werkzeug adds Content-Length, ETag and Range support
+            self._file.close()
+            return send_file(self.path, as_attachment=as_attachment,
+                             download_name=download_name, mimetype=mimetype)
+
+        self._file.seek(0)
+        return send_file(self._file, as_attachment=as_attachment,
+                         download_name=download_name, mimetype=mimetype)
+
+
+def request_sink(filename, threshold_mb=None):
+    """Creates an OutputSink that spills into the current request's workspace."""
+    return OutputSink(temp_storage.request_workspace(request), filename, threshold_mb)
+
+
+# ==========================
+# STREAMED RESPONSES
+# ==========================
+
+def stream_response(chunks, download_name, mimetype, as_attachment=True):
+    """
+    Sends chunks to the client as soon as they are produced.
+    No Content-Length is known up front, so the body is sent chunked.
+    """
+    rv = Response(stream_with_context(chunks), mimetype=mimetype)
+    disposition = 'attachment' if as_attachment else 'inline'
+    rv.headers.set('Content-Disposition', disposition, filename=download_name)
+    return rv
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, unseekable target that collects bytes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pending(self):
+        return bool(self._chunks)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(members, compression=zipfile.ZIP_DEFLATED):
+    """
+    Streams a ZIP archive.
+
+    Args:
+        members: iterable of (arcname, path) - may be a generator, each file
+                 is read only when its turn comes
+
+    Yields:
+        bytes: archive chunks
+    """
+    buffer = _ChunkBuffer()
+    # An unseekable target makes zipfile write data descriptors after each member
+    with zipfile.ZipFile(buffer, 'w', compression=compression) as zf:
+        for arcname, path in members:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, 'rb') as src, zf.open(info, 'w') as dst:
+                while True:
+                    block = src.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    dst.write(block)
+                    if buffer.pending():
+                        yield buffer.drain()
+            if buffer.pending():
+                yield buffer.drain()
+    # Central directory is written when the archive closes
+    yield buffer.drain()
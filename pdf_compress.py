@@ -0,0 +1,264 @@
+import io
+import os
+from collections import namedtuple
+
+import fitz
+from PIL import Image
+
+# Adaptive PDF compression.
+#
+# Every page is classified cheaply from its image placements and text:
+#   - vector pages (no images) are copied through untouched,
+#   - scan-like pages (mostly image, little text) are re-rendered as one JPEG,
+#   - mixed pages keep their text/vector content and only get their
+#     oversized embedded images downsampled.
+
+SCAN_COVERAGE = 0.6     # share of the page covered by images
+SCAN_MAX_TEXT = 100     # characters of real text a scan may carry (OCR layers are ignored below this)
+RASTER_DPI = 110
+RASTER_QUALITY = 60
+IMAGE_TARGET_DPI = 150
+IMAGE_QUALITY = 70
+DOWNSAMPLE_SLACK = 1.25  # only touch images at least this much above the target DPI
+
+KEEP, DOWNSAMPLE, RASTERIZE = 'K', 'D', 'R'
+
+# The knobs a compression run can turn; target_size.py searches over them
+Settings = namedtuple('Settings', 'raster_dpi raster_quality image_dpi image_quality')
+DEFAULT_SETTINGS = Settings(RASTER_DPI, RASTER_QUALITY, IMAGE_TARGET_DPI, IMAGE_QUALITY)
+
+
+def scaled_settings(scale, quality):
+    """Settings with both resolutions scaled down and one JPEG quality for everything."""
+    return Settings(RASTER_DPI * scale, quality, IMAGE_TARGET_DPI * scale, quality)
+
+
+def classify_page(page):
+    """
+    Returns:
+        str: KEEP, DOWNSAMPLE or RASTERIZE
+    """
+    placements = page.get_image_info()
+    if not placements:
+        return KEEP
+
+    page_area = abs(page.rect) or 1
+    covered = sum(abs(fitz.Rect(p['bbox']) & page.rect) for p in placements)
+    coverage = min(1.0, covered / page_area)
+
+    if coverage >= SCAN_COVERAGE and len(page.get_text('text').strip()) < SCAN_MAX_TEXT:
+        return RASTERIZE
+    return DOWNSAMPLE
+
+
+def _page_bytes(doc, page, usage):
+    """
+    Size of the streams a page draws with: its content streams and the
+    images no other page draws. Rasterizing the page only frees those, and
+    summing over pages never counts an image twice.
+    """
+    total = sum(len(doc.xref_stream_raw(xref) or b'') for xref in page.get_contents())
+    for image in page.get_images(full=True):
+        if usage.get(image[0], (0, 1))[1] == 1:
+            total += len(doc.xref_stream_raw(image[0]) or b'')
+    return total
+
+
+def image_usage(doc):
+    """
+    Where every image is drawn across the whole document. An image xref
+    can be drawn on several pages, and replacing it changes all of them,
+    so it must stay sharp enough for the largest placement.
+
+    Returns:
+        dict: image xref -> (widest placement in points, number of pages drawing it)
+    """
+    widths = {}
+    pages = {}
+    for page in doc:
+        for info in page.get_image_info(xrefs=True):
+            xref = info.get('xref')
+            if xref:
+                widths[xref] = max(widths.get(xref, 0), fitz.Rect(info['bbox']).width)
+                pages.setdefault(xref, set()).add(page.number)
+    return {xref: (widths[xref], len(pages[xref])) for xref in widths}
+
+
+def _rasterize(page, settings):
+    scale = settings.raster_dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", optimize=True, quality=settings.raster_quality)
+    return buffer.getvalue()
+
+
+def _downsample_images(doc, page, done, settings, usage):
+    """
+    Re-encodes the page's oversized images in place, sized for their
+    widest placement in ``usage`` (see image_usage).
+
+    Returns:
+        tuple: (bytes of the replaced images, bytes of their replacements)
+    """
+    replaced = written = 0
+    for image in page.get_images(full=True):
+        xref, smask, width, height = image[0], image[1], image[2], image[3]
+        # Images with soft masks keep their transparency only as they are
+        if xref in done or smask:
+            continue
+        done.add(xref)
+
+        shown_width = usage.get(xref, (0, 1))[0] / 72  # inches
+        if not shown_width or width / shown_width < settings.image_dpi * DOWNSAMPLE_SLACK:
+            continue
+
+        original = doc.xref_stream_raw(xref) or b''
+        try:
+            extracted = doc.extract_image(xref)
+            img = Image.open(io.BytesIO(extracted['image']))
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+        except Exception as e:
+            print(f"Skipping image {xref}: {e}")
+            continue
+
+        target_width = max(1, int(shown_width * settings.image_dpi))
+        target_height = max(1, round(height * target_width / width))
+        img = img.resize((target_width, target_height), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", optimize=True, quality=settings.image_quality)
+        if buffer.tell() >= len(original):
+            continue
+
+        page.replace_image(xref, stream=buffer.getvalue())
+        replaced += len(original)
+        written += buffer.tell()
+    return replaced, written
+
+
+def _compress_page(doc, page, done, settings, rasterized, usage):
+    """
+    Applies the page's decision. Rasterized pages are only collected in
+    ``rasterized`` because swapping pages while iterating would shift indexes.
+
+    Returns:
+        tuple: (decision, bytes replaced, bytes written)
+    """
+    decision = classify_page(page)
+
+    if decision == RASTERIZE:
+        before = _page_bytes(doc, page, usage)
+        jpeg = _rasterize(page, settings)
+        # Keep the original when rendering would not make it smaller
+        if len(jpeg) < before:
+            rasterized[page.number] = (page.rect, jpeg)
+            return decision, before, len(jpeg)
+
+    elif decision == DOWNSAMPLE:
+        replaced, written = _downsample_images(doc, page, done, settings, usage)
+        if replaced:
+            return decision, replaced, written
+
+    return KEEP, 0, 0
+
+
+def image_pages(input_path):
+    """
+    Returns:
+        list: 0-based numbers of the pages compression may change
+    """
+    with fitz.open(input_path) as doc:
+        return [page.number for page in doc if classify_page(page) != KEEP]
+
+
+def measure_pages(input_path, page_numbers, settings):
+    """
+    Compresses only the given pages in memory, without saving anything.
+
+    Returns:
+        tuple: (bytes replaced, bytes written) summed over the pages
+    """
+    replaced = written = 0
+    with fitz.open(input_path) as doc:
+        done = set()
+        usage = image_usage(doc)
+        for number in page_numbers:
+            _, page_replaced, page_written = _compress_page(doc, doc[number], done, settings, {}, usage)
+            replaced += page_replaced
+            written += page_written
+    return replaced, written
+
+
+class _Writer:
+    """
+    Passes writes through to ``out`` and counts them. fitz saves real files
+    by their name (replacing them), so it must only see a plain writer.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        return self.out.write(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.out.seek(offset, whence)
+
+    def tell(self):
+        return self.out.tell()
+
+    def flush(self):
+        self.out.flush()
+
+
+def compress_adaptive(input_path, out, settings=DEFAULT_SETTINGS):
+    """
+    Compresses a PDF page by page and writes it to ``out``.
+
+    Returns:
+        dict: report with one decision letter per page
+              (K kept, D images downsampled, R rasterized) and the savings
+    """
+    doc = fitz.open(input_path)
+    try:
+        decisions = []
+        page_savings = {}
+        rasterized = {}
+        done = set()
+        usage = image_usage(doc)
+
+        for page in doc:
+            decision, replaced, written = _compress_page(doc, page, done, settings, rasterized, usage)
+            if decision != KEEP:
+                page_savings[page.number + 1] = replaced - written
+            decisions.append(decision)
+
+        # Swap rasterized pages in last, back to front so indexes stay valid
+        for number in sorted(rasterized, reverse=True):
+            rect, jpeg = rasterized[number]
+            doc.delete_page(number)
+            new_page = doc.new_page(number, width=rect.width, height=rect.height)
+            new_page.insert_image(new_page.rect, stream=jpeg)
+
+        writer = _Writer(out)
+        doc.save(writer, garbage=4, deflate=True)
+        output_bytes = writer.written
+    finally:
+        doc.close()
+
+    decisions = ''.join(decisions)
+    return {
+        'mode': 'adaptive',
+        'pages': len(decisions),
+        'decisions': decisions,
+        'kept': decisions.count(KEEP),
+        'downsampled': decisions.count(DOWNSAMPLE),
+        'rasterized': decisions.count(RASTERIZE),
+        'page_savings': page_savings,
+        'input_bytes': os.path.getsize(input_path),
+        'output_bytes': output_bytes,
+    }
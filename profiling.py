@@ -0,0 +1,240 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+
+import temp_storage
+
+# On-demand profiling of single conversions.
+#
+# A request is profiled when it carries the admin token in PROFILE_HEADER,
+# or when it is picked by PROFILE_SAMPLE_RATE. The conversion then runs
+# under cProfile (in the scheduler thread that executes it) with tracemalloc
+# tracing allocations, and the capture is stored under the request's job ID
+# for the admin endpoints in app.py. Requests that aren't picked only pay
+# for one header lookup.
+
+ADMIN_TOKEN = os.environ.get('PAPERMILL_ADMIN_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PAPERMILL_PROFILE_SAMPLE_RATE', 0))
+PROFILE_HEADER = 'X-Papermill-Profile'
+ADMIN_HEADER = 'X-Papermill-Admin-Token'
+
+# Shared by all workers, so any of them can list every capture
+PROFILE_DIR = os.path.join(temp_storage.SCRATCH_ROOT, 'papermill_profiles')
+MAX_PROFILES = 200
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 20
+TRACEMALLOC_FRAMES = 5
+
+_lock = threading.Lock()
+_tracing = 0         # captures currently using tracemalloc (it is process-wide)
+_owns_tracing = False
+
+
+def new_job_id():
+    return uuid.uuid4().hex[:16]
+
+
+def is_admin(token):
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token or '', ADMIN_TOKEN)
+
+
+def requested(request):
+    """
+    Returns:
+        str: why this request should be profiled ('header' or 'sample'), or None
+    """
+    token = request.headers.get(PROFILE_HEADER)
+    if token is not None and is_admin(token):
+        return 'header'
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+def _start_tracing():
+    global _tracing, _owns_tracing
+    with _lock:
+        if _tracing == 0:
+            # Leave tracing alone if someone else (PYTHONTRACEMALLOC) turned it on
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+        _tracing += 1
+
+
+def _stop_tracing():
+    global _tracing
+    with _lock:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        _tracing -= 1
+        if _tracing == 0 and _owns_tracing:
+            tracemalloc.stop()
+    return snapshot, peak
+
+
+class Capture:
+    """
+    Profiles one conversion. ``wrap`` the function handed to the scheduler;
+    the capture is saved when it returns.
+
+    Note that tracemalloc is process-wide: conversions running at the same
+    time show up in the allocation list too.
+    """
+
+    def __init__(self, job_id, endpoint, trigger, details=None):
+        self.job_id = job_id
+        self.endpoint = endpoint
+        self.trigger = trigger
+        self.details = details or {}
+        self.created = time.time()
+
+    def wrap(self, fn):
+        def profiled(*args, **kwargs):
+            started = time.time()
+            profile = cProfile.Profile()
+            _start_tracing()
+            error = None
+            try:
+                profile.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    profile.disable()
+            except BaseException as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                snapshot, peak = _stop_tracing()
+                try:
+                    self._save(profile, snapshot, peak, started, time.time(), error)
+                except Exception as e:
+                    print(f"Profile {self.job_id} not saved: {e}")
+        return profiled
+
+    def _save(self, profile, snapshot, peak, started, finished, error):
+        stats = pstats.Stats(profile)
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+        # Only allocations made while tracing; skip tracemalloc's own bookkeeping
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        allocations = [
+            {
+                'size_kb': round(stat.size / 1024, 1),
+                'count': stat.count,
+                'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            }
+            for stat in snapshot.statistics('traceback')[:TOP_ALLOCATIONS]
+        ]
+
+        capture = {
+            'job_id': self.job_id,
+            'endpoint': self.endpoint,
+            'trigger': self.trigger,
+            'created': self.created,
+            'queued_seconds': round(started - self.created, 4),
+            'seconds': round(finished - started, 4),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'error': error,
+            'details': self.details,
+            'functions': [
+                {
+                    'function': f"{filename}:{line}({name})",
+                    'calls': calls,
+                    'tottime': round(tottime, 6),
+                    'cumtime': round(cumtime, 6),
+                }
+                for (filename, line, name), (_, calls, tottime, cumtime, _) in functions[:TOP_FUNCTIONS]
+            ],
+            'allocations': allocations,
+            'report': text.getvalue(),
+        }
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile.dump_stats(_path(self.job_id, '.prof'))
+        tmp = _path(self.job_id, f'.json.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(capture, f)
+        os.replace(tmp, _path(self.job_id, '.json'))
+        _evict()
+
+
+def _path(job_id, ext):
+    if not job_id.isalnum():
+        raise KeyError(job_id)
+    return os.path.join(PROFILE_DIR, job_id + ext)
+
+
+def _evict():
+    """Keeps the newest MAX_PROFILES captures."""
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR) if e.name.endswith('.json')]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[MAX_PROFILES:]:
+        job_id = entry.name[:-len('.json')]
+        for ext in ('.json', '.prof'):
+            try:
+                os.remove(_path(job_id, ext))
+            except OSError:
+                pass
+
+
+def list_captures():
+    """
+    Returns:
+        list: summaries of the stored captures, newest first
+    """
+    captures = []
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR) if e.name.endswith('.json')]
+    except FileNotFoundError:
+        return captures
+    for entry in entries:
+        try:
+            with open(entry.path, encoding='utf-8') as f:
+                capture = json.load(f)
+        except (OSError, ValueError):
+            continue
+        captures.append({key: capture.get(key) for key in (
+            'job_id', 'endpoint', 'trigger', 'created', 'seconds', 'peak_memory_kb', 'error')})
+    captures.sort(key=lambda c: c['created'] or 0, reverse=True)
+    return captures
+
+
+def load_capture(job_id):
+    """
+    Raises:
+        KeyError: unknown job ID
+
+    Returns:
+        dict: the full capture
+    """
+    try:
+        with open(_path(job_id, '.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise KeyError(job_id)
+
+
+def stats_path(job_id):
+    """
+    Returns:
+        str: path of the raw cProfile dump (for pstats / snakeviz)
+    """
+    path = _path(job_id, '.prof')
+    if not os.path.exists(path):
+        raise KeyError(job_id)
+    return path
@@ -0,0 +1,97 @@
+import os
+
+import cost_model
+
+# --- Resource classes: decide which executor (and limits) a converter uses ---
+CPU = 'cpu'          # pure-Python / native image & PDF work
+BROWSER = 'browser'  # needs a headless Chromium
+IO = 'io'            # mostly reading and writing bytes
+
+IMAGE_TYPES = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp', '.heif', '.heic'}
+
+
+class Page:
+    """A GET page that renders converter_page.html for a converter."""
+
+    def __init__(self, endpoint, path, title, file_accept, show_doc_warning=False):
+        self.endpoint = endpoint
+        self.path = path
+        self.title = title
+        self.file_accept = file_accept
+        self.show_doc_warning = show_doc_warning
+
+
+class Converter:
+    """
+    Declares a converter; dispatch.py turns it into routes.
+
+    Args:
+        endpoint: Flask endpoint name of the POST action
+        path: URL of the POST action
+        convert: ``convert(input_path, out, work_dir, session=None, **options)``,
+                 or ``convert(input_paths, ...)`` when ``multi_input`` is set
+        input_types: accepted file extensions
+        download_name / mimetype: how the result is sent back
+        resource: CPU, BROWSER or IO
+        streaming: ``convert`` only appends to ``out``, so the output can be
+                   piped to the client while it is produced
+        multi_input: all uploads are combined into one output; otherwise
+                     several uploads are converted as a batch
+        options: form fields the converter accepts, {name: (type, default)}
+        open_session: factory for setup that can be reused between jobs
+        estimate: ``estimate(input_paths)`` -> cheap cost guess used by the
+                  scheduler, see cost_model.py
+        empty_message: error text when nothing usable was uploaded
+        pages: Page entries that post to this converter
+    """
+
+    def __init__(self, endpoint, path, convert, input_types, download_name, mimetype,
+                 resource=CPU, streaming=False, multi_input=False, options=None,
+                 open_session=None, estimate=cost_model.default_estimate,
+                 as_attachment=True, cacheable=True,
+                 empty_message="No file uploaded.", pages=()):
+        self.endpoint = endpoint
+        self.path = path
+        self.convert = convert
+        self.input_types = set(input_types)
+        self.download_name = download_name
+        self.mimetype = mimetype
+        self.resource = resource
+        self.streaming = streaming
+        self.multi_input = multi_input
+        self.options = options or {}
+        self.open_session = open_session
+        self.estimate = estimate
+        self.as_attachment = as_attachment
+        # Streamed outputs are never materialised, so there is nothing to cache
+        self.cacheable = cacheable and not streaming
+        self.empty_message = empty_message
+        self.pages = list(pages)
+
+    @property
+    def output_ext(self):
+        return os.path.splitext(self.download_name)[1]
+
+    def accepts(self, path):
+        return os.path.splitext(path.lower())[1] in self.input_types
+
+    def parse_options(self, form):
+        """Reads the declared options from a request form, with defaults."""
+        return {
+            name: form.get(name, default=default, type=kind)
+            for name, (kind, default) in self.options.items()
+        }
+
+
+CONVERTERS = {}
+
+
+def register(converter):
+    if converter.endpoint in CONVERTERS:
+        raise ValueError(f"Converter already registered: {converter.endpoint}")
+    CONVERTERS[converter.endpoint] = converter
+    return converter
+
+
+def get(endpoint):
+    return CONVERTERS[endpoint]
@@ -0,0 +1,115 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import temp_storage
+
+# Finished outputs are kept on disk so that re-uploading the same file with
+# the same options is answered without converting again.
+# Each process keeps its own directory; the index lives in memory.
+CACHE_DIR = os.path.join(temp_storage.SCRATCH_ROOT, 'papermill_cache', str(os.getpid()))
+MAX_CACHE_MB = int(os.environ.get('PAPERMILL_RESULT_CACHE_MB', 256))
+MAX_ENTRY_MB = 32
+
+_lock = threading.Lock()
+_index = OrderedDict()  # key -> (size in bytes, converter report), oldest first
+_bytes = 0
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+
+def key_for(name, paths, options):
+    """Content hash of the inputs, the converter and its options."""
+    digest = hashlib.sha256()
+    digest.update(name.encode())
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key)
+
+
+def get(key):
+    """
+    The file is opened before the lock is released, so an eviction that
+    follows cannot take it away from the caller.
+
+    Returns:
+        tuple: (open binary file of the cached output, converter report),
+               or (None, None). The caller closes the file.
+    """
+    global _bytes
+    with _lock:
+        if key not in _index:
+            _stats['misses'] += 1
+            return None, None
+        try:
+            f = open(_path(key), 'rb')
+        except OSError:
+            _bytes -= _index.pop(key)[0]
+            _stats['misses'] += 1
+            return None, None
+        _index.move_to_end(key)
+        _stats['hits'] += 1
+        report = _index[key][1]
+    return f, report
+
+
+def put(key, sink, report=None):
+    """Stores the contents of an OutputSink, evicting the least recently used entries."""
+    global _bytes
+    size = sink.size
+    if size > MAX_ENTRY_MB * 1024 * 1024:
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Identical requests may finish at the same time; each writes its own file
+    fd, tmp_path = tempfile.mkstemp(prefix=key + '.', suffix='.tmp', dir=CACHE_DIR)
+    os.close(fd)
+    try:
+        sink.copy_to(tmp_path)
+        os.replace(tmp_path, _path(key))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    with _lock:
+        if key in _index:
+            _bytes -= _index.pop(key)[0]
+        _index[key] = (size, report)
+        _bytes += size
+        _stats['stores'] += 1
+
+        while _bytes > MAX_CACHE_MB * 1024 * 1024 and _index:
+            old_key, (old_size, _) = _index.popitem(last=False)
+            _bytes -= old_size
+            _stats['evictions'] += 1
+            try:
+                # Open handles (responses still streaming) keep the data alive
+                os.remove(_path(old_key))
+            except OSError:
+                pass
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+        data['entries'] = len(_index)
+        data['bytes'] = _bytes
+    return data
+
+
+@atexit.register
+def _clear():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
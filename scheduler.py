@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import Future
+
+# Shortest-job-first scheduling for conversions.
+#
+# Each resource class has its own pool of worker threads and its own queue.
+# Idle workers always pick the queued job with the lowest effective cost,
+# where waiting lowers the cost (aging) so that big jobs still get to run.
+# Large jobs may never occupy every worker of a class: at least one lane
+# stays free for small jobs, which keeps their latency flat.
+#
+# Schedulers live in each worker process: every gunicorn worker has its own
+# pools, queues and limits. Ordering and admission control only work when
+# concurrent requests reach the same process, so the app is served by a
+# threaded worker (gthread, see Procfile/Dockerfile) rather than sync ones.
+
+AGING_RATE = 1.0        # cost units forgiven per second spent waiting
+LARGE_JOB_COST = 10.0   # jobs above this are "large"
+SMALL_JOB_LANES = 1     # workers per class reserved for small jobs
+
+
+class Busy(Exception):
+    """The queue for a resource class is full."""
+
+
+class _Job:
+    def __init__(self, seq, cost, fn, args, kwargs):
+        self.seq = seq
+        self.cost = cost
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.submitted = time.monotonic()
+        self.future = Future()
+
+    @property
+    def large(self):
+        return self.cost > LARGE_JOB_COST
+
+    def priority(self, now):
+        return (self.cost - AGING_RATE * (now - self.submitted), self.seq)
+
+
+class ClassScheduler:
+    """Priority queue plus worker threads for one resource class."""
+
+    def __init__(self, name, workers, max_queued):
+        self.name = name
+        self.workers = workers
+        self.max_queued = max_queued
+        # With a single worker there is no spare lane to reserve
+        self.max_large = max(1, workers - SMALL_JOB_LANES)
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = 0
+        self._running = 0
+        self._large_running = 0
+        self._stats = {
+            'submitted': 0, 'completed': 0, 'rejected': 0,
+            'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0,
+        }
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, daemon=True, name=f'convert-{name}-{i}').start()
+
+    def submit(self, fn, *args, cost=1.0, **kwargs):
+        """
+        Queues ``fn`` with an estimated cost.
+
+        Raises:
+            Busy: when the queue is already full
+
+        Returns:
+            concurrent.futures.Future
+        """
+        with self._cond:
+            if len(self._queue) >= self.max_queued:
+                self._stats['rejected'] += 1
+                raise Busy(self.name)
+            self._seq += 1
+            job = _Job(self._seq, cost, fn, args, kwargs)
+            self._queue.append(job)
+            self._stats['submitted'] += 1
+            self._cond.notify()
+        return job.future
+
+    def _next_job(self):
+        """Lowest effective cost among the jobs allowed to start now."""
+        now = time.monotonic()
+        allow_large = self._large_running < self.max_large
+        best = None
+        for job in self._queue:
+            if job.large and not allow_large:
+                continue
+            if best is None or job.priority(now) < best.priority(now):
+                best = job
+        return best
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._queue.remove(job)
+                self._running += 1
+                if job.large:
+                    self._large_running += 1
+                waited = time.monotonic() - job.submitted
+                self._stats['wait_seconds_total'] += waited
+                self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn(*job.args, **job.kwargs))
+                except BaseException as e:
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._running -= 1
+                if job.large:
+                    self._large_running -= 1
+                self._stats['completed'] += 1
+                # A finished large job may unblock a queued one
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                'workers': self.workers,
+                'queued': len(self._queue),
+                'queued_large': sum(1 for job in self._queue if job.large),
+                'running': self._running,
+                'running_large': self._large_running,
+            })
+        return data
@@ -0,0 +1,482 @@
+import csv
+import itertools
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columnar engine behind every tabular conversion (CSV, JSON, NDJSON, XLSX
+# in; CSV, JSON, XLSX, PDF table out).
+#
+# A reader yields the input as pandas DataFrame chunks of at most
+# CHUNK_ROWS rows. Table infers the column types once, vectorised, from the
+# first chunk and applies them to every chunk; a writer then consumes the
+# chunks one by one. No path holds more than a chunk of the input in
+# memory (JSON is read twice instead: once for the columns, once for rows).
+
+CHUNK_ROWS = 20_000
+JSON_READ_CHARS = 1024 * 1024
+XLSX_MAX_ROWS = 1_048_576
+
+TEXT, INTEGER, FLOAT, BOOLEAN = 'text', 'integer', 'float', 'boolean'
+_NULLABLE = {INTEGER: 'Int64', FLOAT: 'Float64', BOOLEAN: 'boolean'}
+
+_LEADING_ZERO_RE = r'^[+-]?0\d'  # IDs and ZIP codes, not numbers
+_INT64_MIN, _INT64_END = -2 ** 63, 2 ** 63  # integers must fit a nullable Int64 column
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+class TableError(ValueError):
+    """The input can't be read as a table."""
+
+
+# ==========================
+# TYPE INFERENCE
+# ==========================
+
+def _finite(numbers):
+    """Mask of the cells holding a finite number (not NaN, inf or -inf)."""
+    return numbers.notna() & (numbers != np.inf) & (numbers != -np.inf)
+
+
+def _in_int64(numbers):
+    """
+    Mask of the cells within int64. Exact for integer values; for floats,
+    2**63 itself is excluded because it can't be cast.
+    """
+    return (numbers >= _INT64_MIN) & (numbers < _INT64_END)
+
+
+def _to_numbers(series):
+    """
+    pd.to_numeric with cells that don't parse (or aren't finite) as NaN.
+    Unlike errors='coerce' on its own, one bad cell doesn't turn the chunk
+    into float64, which would round integers above 2**53.
+    """
+    numbers = pd.to_numeric(series, errors='coerce')
+    parsed = _finite(numbers)
+    if numbers.dtype.kind != 'f' or parsed.all() or not parsed.any():
+        return numbers
+    exact = pd.to_numeric(series[parsed])
+    if exact.dtype.kind == 'f':
+        return numbers
+    numbers = pd.Series(np.nan, index=series.index, dtype=object)
+    numbers[parsed] = exact.tolist()
+    return numbers
+
+
+def _infer_text(values):
+    """Type of a column read as strings (CSV)."""
+    text = values.astype(str).str.strip()
+    text = text[text != '']
+    if text.empty:
+        return TEXT
+    if text.str.lower().isin(('true', 'false')).all():
+        return BOOLEAN
+    if text.str.match(_LEADING_ZERO_RE).any():
+        return TEXT
+    numbers = pd.to_numeric(text, errors='coerce')
+    if not _finite(numbers).all():
+        return TEXT
+    if text.str.contains(r'[.eE]').any():
+        return FLOAT
+    # Long digit strings (20-digit IDs) are identifiers, not int64 numbers
+    return INTEGER if _in_int64(numbers).all() else TEXT
+
+
+def infer_type(series, typed):
+    """
+    Args:
+        typed: the source stores typed values (JSON, XLSX); strings are
+               then kept as text instead of being parsed
+
+    Returns:
+        str: TEXT, INTEGER, FLOAT or BOOLEAN
+    """
+    values = series.dropna()
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind == 'string':
+        return TEXT if typed else _infer_text(values)
+    if kind == 'boolean':
+        return BOOLEAN
+    if kind == 'integer':
+        return INTEGER if _in_int64(values).all() else TEXT
+    if kind in ('floating', 'mixed-integer-float'):
+        numbers = pd.to_numeric(values)
+        if not _finite(numbers).all():
+            return TEXT
+        if (numbers % 1 == 0).all() and _in_int64(numbers).all():
+            return INTEGER
+        return FLOAT
+    return TEXT
+
+
+def _coerce(series, kind):
+    """
+    Converts one chunk of a column to its inferred type. Cells that don't
+    fit (a later chunk disagreeing with the first) keep their original value.
+    """
+    if kind == TEXT:
+        return series.astype(object).where(series.notna(), None)
+
+    if kind == BOOLEAN:
+        if series.dtype == bool:
+            return series.astype('boolean')
+        text = series.astype(str).str.strip().str.lower()
+        typed = text.map({'true': True, 'false': False}).astype('boolean')
+    else:
+        typed = _to_numbers(series)
+        usable = _finite(typed)
+        if kind == INTEGER:
+            if not (typed[usable] % 1 == 0).all():
+                kind = FLOAT
+            else:
+                usable &= _in_int64(typed)
+        if not usable.all():
+            # inf and out-of-range cells become missing, and keep their original value below
+            if typed.dtype.kind == 'f':
+                typed = typed.where(usable)
+            else:
+                # Through object so integers above 2**53 aren't rounded on the way
+                typed = typed.astype(object).where(usable, None)
+        typed = typed.astype(_NULLABLE[kind])
+
+    blank = series.isna() | (series.astype(str).str.strip() == '')
+    bad = typed.isna() & ~blank
+    if bad.any():
+        return typed.astype(object).where(~bad, series)
+    return typed
+
+
+class Table:
+    """
+    A table streamed as typed, column-oriented chunks.
+
+    Attributes:
+        columns: column names, fixed for the whole table
+        types: {column: TEXT/INTEGER/FLOAT/BOOLEAN}, inferred from the first chunk
+        rows: rows read so far
+    """
+
+    def __init__(self, chunks, typed):
+        self._chunks = iter(chunks)
+        self._first = next(self._chunks)
+        self.columns = [str(c) for c in self._first.columns]
+        self._first.columns = self.columns
+        self.types = {c: infer_type(self._first[c], typed) for c in self.columns}
+        self.rows = 0
+
+    def __iter__(self):
+        first, self._first = self._first, None
+        if first is None:
+            raise RuntimeError("A Table can only be read once.")
+        yield self._typed(first)
+        for chunk in self._chunks:
+            chunk.columns = self.columns
+            yield self._typed(chunk)
+
+    def _typed(self, chunk):
+        self.rows += len(chunk)
+        return pd.DataFrame({c: _coerce(chunk[c], self.types[c]) for c in self.columns},
+                            index=chunk.index)
+
+
+# ==========================
+# READERS
+# ==========================
+
+def detect_csv_format(csv_path):
+    """
+    Sniffs the encoding and delimiter of a CSV file.
+
+    Returns:
+        tuple: (encoding, delimiter)
+    """
+    import chardet
+
+    # Detect encoding
+    with open(csv_path, 'rb') as f:
+        raw = f.read(10000)
+        encoding = chardet.detect(raw)['encoding'] or 'utf-8'
+
+    # Sniff delimiter
+    with open(csv_path, 'r', encoding=encoding, errors='replace') as f:
+        sample = f.read(2048)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=[',', ';', '\t', '|'])
+            delimiter = dialect.delimiter
+        except Exception:
+            delimiter = ','
+
+    return encoding, delimiter
+
+
+def read_csv(path):
+    encoding, delimiter = detect_csv_format(path)
+    with open(path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        try:
+            # Everything is read as text; only empty cells are missing ("NA" stays "NA")
+            yield from pd.read_csv(f, sep=delimiter, dtype=str, keep_default_na=False,
+                                   na_values=[''], chunksize=CHUNK_ROWS)
+        except pd.errors.EmptyDataError:
+            raise TableError("The CSV file is empty.")
+        except pd.errors.ParserError as e:
+            raise TableError(f"Invalid CSV: {e}")
+
+
+def iter_json_values(path):
+    """
+    Yields the elements of a top-level JSON array, or each top-level value
+    of a JSON/NDJSON file, reading the file block by block.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(JSON_READ_CHARS)
+        pos = _WHITESPACE_RE.match(buffer).end()
+        if pos == len(buffer):
+            raise TableError("Invalid JSON: the file is empty.")
+        in_array = buffer[pos:pos + 1] == '['
+        pos += in_array
+        read_size = JSON_READ_CHARS
+
+        while True:
+            pos = _WHITESPACE_RE.match(buffer, pos).end()
+            if pos < len(buffer) and in_array and buffer[pos] == ',':
+                pos += 1
+                continue
+            if pos < len(buffer) and in_array and buffer[pos] == ']':
+                return
+
+            try:
+                if pos == len(buffer):
+                    raise json.JSONDecodeError("Expecting value", buffer, pos)
+                value, end = decoder.raw_decode(buffer, pos)
+                complete = end < len(buffer)  # a number at the very end may be cut off
+            except json.JSONDecodeError as e:
+                error, complete = e, False
+            else:
+                error = None
+
+            if not complete:
+                more = f.read(read_size)
+                if more:
+                    # Values larger than a block: read in growing steps
+                    buffer = buffer[pos:] + more
+                    pos = 0
+                    read_size *= 2
+                    continue
+                if error is not None:
+                    if pos == len(buffer) and not in_array:
+                        return
+                    raise TableError(f"Invalid JSON: {error}")
+
+            read_size = JSON_READ_CHARS
+            yield value
+            pos = end
+
+
+def _flat_keys(record, prefix=''):
+    """Column names pandas.json_normalize gives a record, in the same order."""
+    keys = [prefix + k for k, v in record.items() if not isinstance(v, dict)]
+    for k, v in record.items():
+        if isinstance(v, dict):
+            keys.extend(_flat_keys(v, prefix + k + '.'))
+    return keys
+
+
+def _records(path):
+    for value in iter_json_values(path):
+        yield value if isinstance(value, dict) else {'value': value}
+
+
+def read_json(path):
+    # First pass: the columns of every record, so CSV headers are known upfront
+    columns = {}
+    for record in _records(path):
+        columns.update(dict.fromkeys(_flat_keys(record)))
+    columns = list(columns)
+
+    batch = []
+    produced = False
+    for record in _records(path):
+        batch.append(record)
+        if len(batch) >= CHUNK_ROWS:
+            yield pd.json_normalize(batch).reindex(columns=columns)
+            produced = True
+            batch = []
+    if batch or not produced:
+        yield pd.json_normalize(batch).reindex(columns=columns)
+
+
+def read_xlsx(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [str(h) if h is not None else f"column_{i + 1}" for i, h in enumerate(header)]
+        width = len(columns)
+
+        batch = []
+        for row in rows:
+            batch.append(row[:width] + (None,) * (width - len(row)))
+            if len(batch) >= CHUNK_ROWS:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        wb.close()
+
+
+READERS = {
+    '.csv': (read_csv, False),
+    '.json': (read_json, True),
+    '.ndjson': (read_json, True),
+    '.jsonl': (read_json, True),
+    '.xlsx': (read_xlsx, True),
+}
+
+
+def open_table(path):
+    """
+    Returns:
+        Table: the file's rows, by extension
+    """
+    ext = os.path.splitext(path.lower())[1]
+    if ext not in READERS:
+        raise TableError(f"Unsupported table format: {ext}")
+    reader, typed = READERS[ext]
+    return Table(reader(path), typed)
+
+
+# ==========================
+# WRITERS
+# ==========================
+
+def write_csv(table, out):
+    for i, chunk in enumerate(table):
+        text = chunk.to_csv(index=False, header=(i == 0), lineterminator='\r\n')
+        out.write(text.encode('utf-8'))
+
+
+def write_json(table, out):
+    """Writes a JSON array of records."""
+    out.write(b'[')
+    first = True
+    for chunk in table:
+        if chunk.empty:
+            continue
+        records = chunk.to_json(orient='records', date_format='iso', default_handler=str,
+                                force_ascii=False)[1:-1]
+        out.write((records if first else ',' + records).encode('utf-8'))
+        first = False
+    out.write(b']')
+
+
+def write_xlsx(table, out):
+    """Writes a workbook in write-only mode; rows beyond Excel's limit go to further sheets."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = Workbook(write_only=True)
+    sheet = None
+    rows = XLSX_MAX_ROWS
+
+    for chunk in table:
+        for column, kind in table.types.items():
+            if kind == TEXT:
+                # Control characters are not allowed in XLSX cells
+                cleaned = chunk[column].str.replace(ILLEGAL_CHARACTERS_RE, '', regex=True)
+                chunk[column] = cleaned.where(cleaned.notna(), chunk[column])
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+
+        for row in chunk.itertuples(index=False, name=None):
+            if rows >= XLSX_MAX_ROWS:
+                sheet = wb.create_sheet()
+                sheet.append(table.columns)
+                rows = 1
+            sheet.append(row)
+            rows += 1
+
+    if sheet is None:
+        wb.create_sheet().append(table.columns)
+    wb.save(out)
+
+
+def write_pdf(table, out):
+    """Renders the rows as a table, header repeated on every page."""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    font, bold, size, row_height, margin = 'Helvetica', 'Helvetica-Bold', 8, 12, 36
+    page_width, page_height = landscape(A4) if len(table.columns) > 6 else A4
+    usable = page_width - 2 * margin
+
+    c = canvas.Canvas(out, pagesize=(page_width, page_height))
+    chunks = iter(table)
+    first = next(chunks)
+
+    # Column widths from the header and the first chunk, shared by all pages
+    lengths = [
+        max(len(name), first[name].dropna().astype(str).str.len().clip(upper=40).mean()
+            if first[name].notna().any() else 0) + 2
+        for name in table.columns
+    ]
+    total = sum(lengths) or 1
+    widths = [usable * n / total for n in lengths]
+    max_chars = [max(1, int(w / (size * 0.5))) for w in widths]
+
+    def draw_row(values, y, font_name):
+        c.setFont(font_name, size)
+        x = margin
+        for value, width, limit in zip(values, widths, max_chars):
+            text = '' if value is None or value is pd.NA else str(value)
+            if len(text) > limit:
+                text = text[:max(1, limit - 1)] + '…'
+            c.drawString(x + 2, y, text)
+            x += width
+
+    def new_page():
+        y = page_height - margin
+        draw_row(table.columns, y, bold)
+        c.line(margin, y - 3, page_width - margin, y - 3)
+        return y - row_height
+
+    y = new_page()
+    for chunk in itertools.chain([first], chunks):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            if y < margin:
+                c.showPage()
+                y = new_page()
+            draw_row(row, y, font)
+            y -= row_height
+    c.save()
+
+
+WRITERS = {
+    'csv': write_csv,
+    'json': write_json,
+    'xlsx': write_xlsx,
+    'pdf': write_pdf,
+}
+
+
+def convert(input_path, out, output_format):
+    """
+    Converts any supported table file to ``output_format``.
+
+    Returns:
+        dict: report with the row and column counts and the inferred types
+    """
+    table = open_table(input_path)
+    WRITERS[output_format](table, out)
+    types = list(table.types.values())
+    return {
+        'rows': table.rows,
+        'columns': len(table.columns),
+        'types': {kind: types.count(kind) for kind in sorted(set(types))},
+    }
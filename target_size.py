@@ -0,0 +1,251 @@
+import io
+import math
+import os
+import shutil
+
+import numpy as np
+from PIL import Image
+
+import pdf_compress
+import temp_storage
+
+# Target-size compression ("make this under 2 MB").
+#
+# Instead of trial-compressing the whole file over and over, a few pages
+# (PDF) or tiles (image) are encoded at a handful of scale/quality settings
+# and a small model is fitted to the resulting sizes:
+#
+#     log(bytes) = a + b * quality + c * log(scale)
+#
+# The model picks the largest scale, then the highest quality, expected to
+# fit the budget. The full file is compressed once; if the result misses
+# the budget the model is shifted by the observed error and at most one
+# corrective pass runs. The report carries the estimate error so the
+# sampling can be tuned over time.
+
+SAMPLE_SCALES = (1.0, 0.6)
+SAMPLE_QUALITIES = (35, 60, 85)
+SCALES = (1.0, 0.85, 0.7, 0.55, 0.4, 0.3, 0.2)
+MIN_QUALITY = 40     # prefer a smaller scale over going below this
+QUALITY_FLOOR = 15   # never go below this, even at the smallest scale
+MAX_QUALITY = 90
+UNDERSHOOT = 0.5     # a result under half the budget is worth a second pass too
+
+SAMPLE_PAGES = 4     # PDF pages encoded per setting
+MIN_SAMPLES = 3      # usable size samples needed to fit the model
+TILE = 384           # image tile edge in pixels
+SAMPLE_TILES = 6
+
+
+class SizeModel:
+    """Least-squares fit of log(bytes) against quality and log(scale)."""
+
+    def __init__(self, samples):
+        """
+        Args:
+            samples: list of (scale, quality, bytes)
+        """
+        rows = np.array([[1.0, q, math.log(s)] for s, q, _ in samples])
+        sizes = np.log([max(1, size) for _, _, size in samples])
+        self.coef = np.linalg.lstsq(rows, sizes, rcond=None)[0]
+        self.offset = 0.0
+
+    def predict(self, scale, quality):
+        a, b, c = self.coef
+        return math.exp(a + b * quality + c * math.log(scale) + self.offset)
+
+    def correct(self, predicted, actual):
+        """Shifts the model by the error of the last prediction."""
+        self.offset += math.log(max(1, actual) / max(1, predicted))
+
+    def choose(self, target):
+        """
+        Returns:
+            tuple: (scale, quality) expected to land just under ``target``
+        """
+        a, b, c = self.coef
+        quality = QUALITY_FLOOR
+        for scale in SCALES:
+            if b <= 0:
+                # Size does not grow with quality (flat samples): quality is free
+                quality = MAX_QUALITY if self.predict(scale, MAX_QUALITY) <= target else QUALITY_FLOOR
+            else:
+                quality = (math.log(target) - a - c * math.log(scale) - self.offset) / b
+            if quality >= MIN_QUALITY:
+                return scale, int(min(quality, MAX_QUALITY))
+        return SCALES[-1], int(max(QUALITY_FLOOR, min(quality, MAX_QUALITY)))
+
+
+def _search(model, target, run):
+    """
+    Runs the full pass, and one corrective pass when it misses the budget.
+
+    Args:
+        run: ``run(scale, quality)`` -> (output size, result)
+
+    Returns:
+        tuple: (result to keep, report)
+    """
+    scale, quality = model.choose(target)
+    predicted = model.predict(scale, quality)
+    size, result = run(scale, quality)
+    # The error of the first pass is what the sampling got wrong
+    error = size / predicted - 1
+    passes = 1
+
+    attempts = [(size, result, scale, quality)]
+    if size > target or size < target * UNDERSHOOT:
+        model.correct(predicted, size)
+        retry = model.choose(target)
+        if retry != (scale, quality):
+            size, result = run(*retry)
+            attempts.append((size, result) + retry)
+            passes = 2
+
+    # The largest output that fits, or the smallest one if none does
+    fitting = [a for a in attempts if a[0] <= target]
+    best = max(fitting, key=lambda a: a[0]) if fitting else min(attempts, key=lambda a: a[0])
+    size, result, scale, quality = best
+    return result, {
+        'target_bytes': target,
+        'predicted_bytes': int(predicted),
+        'output_bytes': size,
+        'estimate_error': round(error, 3),
+        'met': size <= target,
+        'passes': passes,
+        'scale': scale,
+        'quality': quality,
+    }
+
+
+# ==========================
+# PDF
+# ==========================
+
+def _spread(items, count):
+    """Up to ``count`` evenly spaced items."""
+    if len(items) <= count:
+        return list(items)
+    step = len(items) / count
+    return [items[int(i * step)] for i in range(count)]
+
+
+def compress_pdf(input_path, out, work_dir, target):
+    """
+    Compresses a PDF adaptively (see pdf_compress.py) to fit ``target`` bytes.
+
+    Returns:
+        dict: report
+    """
+    input_bytes = os.path.getsize(input_path)
+    if input_bytes <= target:
+        with open(input_path, 'rb') as f:
+            shutil.copyfileobj(f, out)
+        return {'mode': 'target', 'target_bytes': target, 'predicted_bytes': input_bytes,
+                'output_bytes': input_bytes, 'estimate_error': 0.0, 'met': True, 'passes': 0}
+
+    def adaptive_only():
+        report = pdf_compress.compress_adaptive(input_path, out)
+        report.update({'mode': 'target', 'target_bytes': target, 'predicted_bytes': input_bytes,
+                       'estimate_error': round(report['output_bytes'] / input_bytes - 1, 3),
+                       'met': report['output_bytes'] <= target, 'passes': 1})
+        return report
+
+    candidates = pdf_compress.image_pages(input_path)
+    if not candidates:
+        # Nothing compression can change: vector pages only
+        return adaptive_only()
+
+    # Sampled pages stand in for all pages that compression can touch
+    sample = _spread(candidates, SAMPLE_PAGES)
+    factor = len(candidates) / len(sample)
+    samples = []
+    for scale in SAMPLE_SCALES:
+        for quality in SAMPLE_QUALITIES:
+            settings = pdf_compress.scaled_settings(scale, quality)
+            replaced, written = pdf_compress.measure_pages(input_path, sample, settings)
+            estimate = input_bytes - factor * (replaced - written)
+            # Extrapolating a few heavy pages can overshoot the whole file
+            if estimate > 0:
+                samples.append((scale, quality, estimate))
+    if len(samples) < MIN_SAMPLES:
+        # Too little to fit a model on
+        return adaptive_only()
+    model = SizeModel(samples)
+
+    def run(scale, quality):
+        path = os.path.join(work_dir, f'target_{scale}_{quality}.pdf')
+        with open(path, 'wb') as f:
+            report = pdf_compress.compress_adaptive(input_path, f,
+                                                    pdf_compress.scaled_settings(scale, quality))
+        temp_storage.reserve_file(path)
+        return report['output_bytes'], (path, report)
+
+    (path, report), search = _search(model, target, run)
+    with open(path, 'rb') as f:
+        shutil.copyfileobj(f, out)
+
+    report.update(search)
+    report.update({'mode': 'target', 'sampled_pages': len(sample)})
+    return report
+
+
+# ==========================
+# IMAGE
+# ==========================
+
+def _tile_boxes(width, height, scale):
+    """Boxes of the source image that become TILE x TILE tiles at ``scale``."""
+    edge = min(int(TILE / scale), width, height)
+    cols = max(1, min(3, width // edge))
+    rows = max(1, min(2, height // edge))
+    boxes = []
+    for row in range(rows):
+        for col in range(cols):
+            left = (width - edge) * col // max(1, cols - 1) if cols > 1 else (width - edge) // 2
+            top = (height - edge) * row // max(1, rows - 1) if rows > 1 else (height - edge) // 2
+            boxes.append((left, top, left + edge, top + edge))
+    return boxes[:SAMPLE_TILES]
+
+
+def _encode(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', optimize=True, quality=quality)
+    return buffer
+
+
+def compress_image(img, out, target):
+    """
+    Encodes ``img`` (RGB or L) as a JPEG that fits ``target`` bytes.
+
+    Returns:
+        dict: report
+    """
+    width, height = img.size
+    samples = []
+    for scale in SAMPLE_SCALES:
+        boxes = _tile_boxes(width, height, scale)
+        tiles = [img.crop(box) for box in boxes]
+        if scale != 1.0:
+            tiles = [t.resize((max(1, round(t.width * scale)), max(1, round(t.height * scale))),
+                              Image.LANCZOS) for t in tiles]
+        pixels = sum(t.width * t.height for t in tiles)
+        for quality in SAMPLE_QUALITIES:
+            sample_bytes = sum(_encode(t, quality).tell() for t in tiles)
+            # Bytes per pixel of the tiles, applied to the whole image at that scale
+            samples.append((scale, quality, sample_bytes / pixels * width * height * scale * scale))
+    model = SizeModel(samples)
+
+    def run(scale, quality):
+        resized = img
+        if scale != 1.0:
+            resized = img.resize((max(1, round(width * scale)), max(1, round(height * scale))),
+                                 Image.LANCZOS)
+        buffer = _encode(resized, quality)
+        return buffer.tell(), buffer
+
+    buffer, report = _search(model, target, run)
+    out.write(buffer.getvalue())
+
+    report.update({'mode': 'target', 'sampled_tiles': len(_tile_boxes(width, height, 1.0))})
+    return report
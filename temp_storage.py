@@ -0,0 +1,263 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from flask import after_this_request, g, has_request_context
+
+# --- Scratch-space settings (overridable from the environment) ---
+SCRATCH_ROOT = os.environ.get('PAPERMILL_SCRATCH_DIR', tempfile.gettempdir())
+RAM_SCRATCH_ROOT = os.environ.get('PAPERMILL_RAM_SCRATCH_DIR', '/dev/shm')
+USE_RAM_SCRATCH = os.environ.get('PAPERMILL_RAM_SCRATCH', '1') == '1'
+
+WORKSPACE_QUOTA_MB = int(os.environ.get('PAPERMILL_WORKSPACE_QUOTA_MB', 300))
+RAM_JOB_LIMIT_MB = int(os.environ.get('PAPERMILL_RAM_JOB_LIMIT_MB', 8))
+# Quota of a workspace in tmpfs; jobs that need more scratch are rejected
+RAM_WORKSPACE_QUOTA_MB = int(os.environ.get('PAPERMILL_RAM_WORKSPACE_QUOTA_MB', 64))
+RAM_MIN_FREE_MB = 64  # never push tmpfs below this much free space
+
+WORKSPACE_PREFIX = 'papermill-'
+ORPHAN_MAX_AGE = 60 * 60  # seconds an untracked workspace may sit before the janitor removes it
+JANITOR_INTERVAL = 5 * 60
+
+_lock = threading.Lock()
+_active = {}
+_counters = {
+    'workspaces_created': 0,
+    'ram_workspaces_created': 0,
+    'workspaces_cleaned': 0,
+    'cleanup_failures': 0,
+    'quota_rejections': 0,
+    'orphans_removed': 0,
+    'bytes_reserved': 0,
+}
+_janitor = None
+
+
+class QuotaExceeded(Exception):
+    """Raised when a request tries to write more than its workspace allows."""
+
+
+def _count(key, amount=1):
+    with _lock:
+        _counters[key] += amount
+
+
+class Workspace:
+    """
+    A per-request scratch directory with a byte quota.
+    Writers call ``reserve()`` before putting bytes on disk; converters,
+    which only see a directory, call ``reserve_file()`` after each file.
+    """
+
+    def __init__(self, path, quota_bytes, in_ram=False):
+        self.path = path
+        self.quota_bytes = quota_bytes
+        self.in_ram = in_ram
+        self.reserved = 0
+        self.created = time.time()
+        self.closed = False
+        self._reserve_lock = threading.Lock()
+
+    def reserve(self, nbytes):
+        with self._reserve_lock:
+            if self.reserved + nbytes > self.quota_bytes:
+                _count('quota_rejections')
+                raise QuotaExceeded(
+                    f"Request needs more than {self.quota_bytes // (1024 * 1024)} MB of scratch space."
+                )
+            self.reserved += nbytes
+        _count('bytes_reserved', nbytes)
+
+    def join(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    def mkdir(self, name):
+        sub = self.join(name)
+        os.makedirs(sub, exist_ok=True)
+        return sub
+
+    def usage(self):
+        """Bytes currently on disk inside the workspace."""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for f in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, f))
+                except OSError:
+                    pass
+        return total
+
+    def cleanup(self):
+        if self.closed:
+            return
+        self.closed = True
+        with _lock:
+            _active.pop(self.path, None)
+        try:
+            shutil.rmtree(self.path)
+            _count('workspaces_cleaned')
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _count('cleanup_failures')
+            print("Cleanup warning:", e)
+
+
+def _ram_quota(expected_bytes, quota_bytes):
+    """
+    Called with _lock held.
+
+    Returns:
+        int: the quota a new workspace gets in tmpfs, or 0 if it belongs on disk
+    """
+    if not USE_RAM_SCRATCH or not os.path.isdir(RAM_SCRATCH_ROOT):
+        return 0
+    if expected_bytes is None or expected_bytes > RAM_JOB_LIMIT_MB * 1024 * 1024:
+        return 0
+    try:
+        free = shutil.disk_usage(RAM_SCRATCH_ROOT).free
+    except OSError:
+        return 0
+    quota = min(quota_bytes, RAM_WORKSPACE_QUOTA_MB * 1024 * 1024)
+    # What the RAM workspaces handed out so far may still write
+    promised = sum(max(0, ws.quota_bytes - ws.reserved) for ws in _active.values() if ws.in_ram)
+    if free - promised - quota < RAM_MIN_FREE_MB * 1024 * 1024:
+        return 0
+    return quota
+
+
+def create_workspace(expected_bytes=None, quota_mb=WORKSPACE_QUOTA_MB):
+    """
+    Creates a scratch directory. Small jobs go to the RAM-backed location
+    when one is available, with a quota tmpfs can hold alongside every
+    other RAM workspace; everything else goes to SCRATCH_ROOT.
+
+    Returns:
+        Workspace
+    """
+    with _lock:
+        quota = _ram_quota(expected_bytes, quota_mb * 1024 * 1024)
+        in_ram = quota > 0
+        root = RAM_SCRATCH_ROOT if in_ram else SCRATCH_ROOT
+        path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=root)
+
+        ws = Workspace(path, quota or quota_mb * 1024 * 1024, in_ram=in_ram)
+        _active[path] = ws
+        _counters['workspaces_created'] += 1
+        if in_ram:
+            _counters['ram_workspaces_created'] += 1
+    return ws
+
+
+def reserve_file(path):
+    """
+    Counts a file a converter wrote into its scratch directory against the
+    quota of the workspace it lies in. Files outside every workspace
+    (tests, scripts) are ignored.
+
+    Raises:
+        QuotaExceeded: the workspace is over its quota
+    """
+    with _lock:
+        ws = next((ws for ws in _active.values() if path.startswith(ws.path + os.sep)), None)
+    if ws is not None:
+        ws.reserve(os.path.getsize(path))
+
+
+def request_workspace(request):
+    """
+    Returns the workspace of the current request, creating it on first use.
+    It is removed once the response body has been fully sent (or the
+    request failed).
+
+    Returns:
+        Workspace
+    """
+    if has_request_context() and getattr(g, 'papermill_workspace', None) is not None:
+        return g.papermill_workspace
+
+    ws = create_workspace(expected_bytes=request.content_length)
+
+    if has_request_context():
+        g.papermill_workspace = ws
+
+        @after_this_request
+        def _cleanup_on_close(response):
+            # call_on_close runs after send_file has streamed the last byte.
+            # Werkzeug skips close callbacks for direct-passthrough bodies,
+            # so route send_file responses through the normal iterator.
+            response.direct_passthrough = False
+            response.call_on_close(ws.cleanup)
+            return response
+
+    return ws
+
+
+def sweep_orphans(max_age=ORPHAN_MAX_AGE):
+    """Removes stale workspaces left behind by crashed or killed workers."""
+    now = time.time()
+    removed = 0
+    for root in {SCRATCH_ROOT, RAM_SCRATCH_ROOT}:
+        if not os.path.isdir(root):
+            continue
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.startswith(WORKSPACE_PREFIX) or not entry.is_dir(follow_symlinks=False):
+                continue
+            with _lock:
+                if entry.path in _active:
+                    # Still in use by a request in this process, however old
+                    continue
+            try:
+                age = now - entry.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                continue
+            if age < max_age:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    if removed:
+        _count('orphans_removed', removed)
+        print(f"Janitor removed {removed} stale workspace(s).")
+    return removed
+
+
+def _janitor_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            sweep_orphans()
+        except Exception as e:
+            print("Janitor error:", e)
+
+
+def start_janitor(interval=JANITOR_INTERVAL):
+    """Starts the background janitor once per process."""
+    global _janitor
+    with _lock:
+        if _janitor is not None and _janitor.is_alive():
+            return
+        _janitor = threading.Thread(target=_janitor_loop, args=(interval,), daemon=True, name='scratch-janitor')
+        _janitor.start()
+
+
+def metrics():
+    with _lock:
+        data = dict(_counters)
+        active = list(_active.values())
+
+    data['workspaces_active'] = len(active)
+    data['ram_workspaces_active'] = sum(1 for ws in active if ws.in_ram)
+    data['bytes_in_use'] = sum(ws.usage() for ws in active)
+
+    for label, root in (('disk', SCRATCH_ROOT), ('ram', RAM_SCRATCH_ROOT)):
+        if os.path.isdir(root):
+            usage = shutil.disk_usage(root)
+            data[f'{label}_free_bytes'] = usage.free
+            data[f'{label}_total_bytes'] = usage.total
+    return data
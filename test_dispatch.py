@@ -0,0 +1,29 @@
+import os
+import threading
+
+import dispatch
+import temp_storage
+
+
+def test_pipe_writes_never_wait_for_the_client():
+    ws = temp_storage.create_workspace()
+    pipe = dispatch._PipeWriter(ws)
+    chunks = [os.urandom(1000) + bytes([n]) for n in range(dispatch.PIPE_CHUNKS * 4)]
+
+    def convert():
+        for chunk in chunks:
+            pipe.write(chunk)
+        pipe.finish()
+
+    try:
+        # Nobody reads yet: the converter still finishes, spilling what doesn't fit
+        writer = threading.Thread(target=convert)
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        assert len(pipe._memory) == dispatch.PIPE_CHUNKS
+
+        body = b''.join(dispatch._iter_pipe(pipe, pipe.next_chunk()))
+        assert body == b''.join(chunks)
+    finally:
+        ws.cleanup()
@@ -0,0 +1,47 @@
+import json
+import random
+
+import job_reports
+
+
+def _adaptive_report(pages):
+    rng = random.Random(pages)
+    decisions = ''.join(rng.choice('KDR') for _ in range(pages))
+    return {
+        'mode': 'adaptive',
+        'pages': pages,
+        'decisions': decisions,
+        'page_savings': {n + 1: rng.randrange(10 ** 6) for n, d in enumerate(decisions) if d != 'K'},
+        'output_bytes': 123456,
+    }
+
+
+def test_run_length():
+    assert job_reports.run_length('KKKDRR') == '3K1D2R'
+    assert job_reports.run_length('') == ''
+
+
+def test_summary_of_a_long_document_stays_small():
+    report = _adaptive_report(500)
+    summary = job_reports.summarize(report)
+
+    assert len(json.dumps(summary, separators=(',', ':'))) < 512
+    assert summary['page_savings_count'] == len(report['page_savings'])
+    assert summary['page_savings_total'] == sum(report['page_savings'].values())
+    assert summary['decisions_rle'].endswith('...')
+    assert summary['output_bytes'] == 123456
+
+
+def test_short_reports_are_unchanged():
+    report = {'mode': 'adaptive', 'pages': 3, 'decisions': 'KKD', 'output_bytes': 10}
+    assert job_reports.summarize(report) == report
+
+
+def test_full_report_is_kept(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_reports, 'REPORT_DIR', str(tmp_path))
+    report = _adaptive_report(500)
+    job_reports.save('abc123', report)
+
+    loaded = job_reports.load('abc123')
+    assert loaded['decisions'] == report['decisions']
+    assert len(loaded['page_savings']) == len(report['page_savings'])
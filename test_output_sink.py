@@ -0,0 +1,57 @@
+import io
+
+import fitz
+from PIL import Image
+
+import output_sink
+import temp_storage
+from app import app
+
+
+def _pdf(pages):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number + 1}")
+        # Incompressible image, so the file spans several copy chunks
+        image = io.BytesIO()
+        Image.effect_noise((256, 256), 80).convert('RGB').save(image, format='PNG')
+        page.insert_image(fitz.Rect(72, 100, 328, 356), stream=image.getvalue())
+    return doc.tobytes()
+
+
+def test_spill_never_touches_an_upload_named_like_the_output():
+    ws = temp_storage.create_workspace()
+    try:
+        upload = ws.join('output.pdf')
+        with open(upload, 'wb') as f:
+            f.write(b'uploaded bytes')
+
+        sink = output_sink.OutputSink(ws, 'output.pdf', threshold_mb=0)
+        sink.write(b'converted bytes')
+        assert sink.spilled
+        assert sink.path != upload
+
+        with open(upload, 'rb') as f:
+            assert f.read() == b'uploaded bytes'
+        assert sink.getvalue() == b'converted bytes'
+    finally:
+        ws.cleanup()
+
+
+def test_uploading_output_pdf_converts_the_whole_file(monkeypatch):
+    # Spill every output, so the sink file is created while the upload is read
+    monkeypatch.setattr(output_sink, 'SPILL_THRESHOLD_MB', 0)
+    data = _pdf(3)
+
+    # A budget above the file size copies the upload through unchanged
+    response = app.test_client().post(
+        '/compress-pdf-action',
+        data={'files': [(io.BytesIO(data), 'output.pdf')], 'target_kb': '20000'},
+        content_type='multipart/form-data',
+    )
+    body = response.get_data()
+    response.close()
+
+    assert response.status_code == 200
+    assert body == data
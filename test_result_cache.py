@@ -0,0 +1,53 @@
+import threading
+
+import output_sink
+import result_cache
+import temp_storage
+
+
+def _sink(ws, data):
+    sink = output_sink.OutputSink(ws, 'output.pdf', threshold_mb=0)
+    sink.write(data)
+    return sink
+
+
+def test_identical_results_stored_at_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, 'CACHE_DIR', str(tmp_path))
+    ws = temp_storage.create_workspace()
+    errors = []
+
+    def store(data):
+        try:
+            result_cache.put('same-key', _sink(ws, data))
+        except Exception as e:
+            errors.append(e)
+
+    try:
+        threads = [threading.Thread(target=store, args=(b'x' * 200000,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['same-key']
+    finally:
+        ws.cleanup()
+
+
+def test_hit_survives_eviction(monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, 'CACHE_DIR', str(tmp_path))
+    ws = temp_storage.create_workspace()
+    try:
+        result_cache.put('old-key', _sink(ws, b'cached output'))
+        cached, _ = result_cache.get('old-key')
+
+        # Filling the cache evicts the entry before the response is read
+        monkeypatch.setattr(result_cache, 'MAX_CACHE_MB', 0)
+        result_cache.put('new-key', _sink(ws, b'newer output'))
+        assert result_cache.get('old-key') == (None, None)
+
+        with cached:
+            assert cached.read() == b'cached output'
+    finally:
+        ws.cleanup()
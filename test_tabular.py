@@ -0,0 +1,77 @@
+import pandas as pd
+
+import tabular
+from tabular import BOOLEAN, FLOAT, INTEGER, TEXT
+
+
+def _text(*values):
+    return pd.Series(values, dtype=object)
+
+
+# ==========================
+# TYPE INFERENCE
+# ==========================
+
+def test_infer_text_types():
+    assert tabular.infer_type(_text('1', '-2', None), typed=False) == INTEGER
+    assert tabular.infer_type(_text('1.5', '2'), typed=False) == FLOAT
+    assert tabular.infer_type(_text('true', 'False'), typed=False) == BOOLEAN
+    assert tabular.infer_type(_text('007', '12'), typed=False) == TEXT
+    assert tabular.infer_type(_text('1', 'abc'), typed=False) == TEXT
+
+
+def test_infer_text_keeps_ids_beyond_int64_as_text():
+    assert tabular.infer_type(_text('12345678901234567890', '1'), typed=False) == TEXT
+    assert tabular.infer_type(_text('9223372036854775808'), typed=False) == TEXT
+    assert tabular.infer_type(_text('9223372036854775807', '-9223372036854775808'), typed=False) == INTEGER
+
+
+def test_infer_text_non_finite_is_text():
+    assert tabular.infer_type(_text('1', 'inf'), typed=False) == TEXT
+    assert tabular.infer_type(_text('1.5', '-Infinity'), typed=False) == TEXT
+    assert tabular.infer_type(_text('1', 'NaN'), typed=False) == TEXT
+
+
+def test_infer_typed_values():
+    assert tabular.infer_type(pd.Series([1, 2**70], dtype=object), typed=True) == TEXT
+    assert tabular.infer_type(pd.Series([1.0, float('inf')]), typed=True) == TEXT
+    assert tabular.infer_type(pd.Series([1.0, 1e20]), typed=True) == FLOAT
+    assert tabular.infer_type(pd.Series([1.0, 2.0]), typed=True) == INTEGER
+    assert tabular.infer_type(_text('12'), typed=True) == TEXT
+
+
+# ==========================
+# COERCION
+# ==========================
+
+def test_coerce_integers_exactly():
+    result = tabular._coerce(_text('9007199254740993', '9223372036854775807', None), INTEGER)
+    assert str(result.dtype) == 'Int64'
+    assert result.tolist()[:2] == [9007199254740993, 9223372036854775807]
+    assert result.isna().tolist()[2]
+
+
+def test_coerce_keeps_cells_that_do_not_fit():
+    values = _text('1', '12345678901234567890', 'inf', 'abc', '9007199254740993', '')
+    result = tabular._coerce(values, INTEGER).tolist()
+    assert result[:5] == [1, '12345678901234567890', 'inf', 'abc', 9007199254740993]
+    assert pd.isna(result[5])
+
+
+def test_coerce_float_keeps_non_finite_cells():
+    result = tabular._coerce(_text('1.5', 'inf', '-inf'), FLOAT).tolist()
+    assert result == [1.5, 'inf', '-inf']
+
+
+def test_coerce_integer_column_with_fractions_becomes_float():
+    assert tabular._coerce(_text('1', '2.5'), INTEGER).tolist() == [1.0, 2.5]
+
+
+def test_csv_ids_survive_conversion(tmp_path):
+    path = tmp_path / 'ids.csv'
+    path.write_text('id,n\n12345678901234567890,1\n22345678901234567890,inf\n')
+    out = tmp_path / 'out.json'
+    with open(out, 'wb') as f:
+        tabular.convert(str(path), f, 'json')
+    assert out.read_text() == ('[{"id":"12345678901234567890","n":"1"},'
+                               '{"id":"22345678901234567890","n":"inf"}]')
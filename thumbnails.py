@@ -0,0 +1,199 @@
+import hashlib
+import io
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+
+import fitz
+from PIL import Image
+
+import temp_storage
+
+# Low-resolution page previews for uploaded PDFs.
+#
+# A document is uploaded once and stored under its SHA-256; pages are then
+# rendered one at a time, only when the browser asks for them, and the
+# encoded images are kept in an in-memory LRU keyed by
+# (document hash, page, size, format).
+
+# Shared by all workers, so a preview can be served by any of them
+PREVIEW_DIR = os.path.join(temp_storage.SCRATCH_ROOT, 'papermill_previews')
+MAX_PREVIEW_DOCS_MB = int(os.environ.get('PAPERMILL_PREVIEW_DOCS_MB', 512))
+THUMB_CACHE_MB = int(os.environ.get('PAPERMILL_THUMB_CACHE_MB', 64))
+OPEN_DOCS = 8
+
+# Requested sizes are snapped to these widths to keep the cache small
+THUMB_WIDTHS = (96, 160, 240, 320)
+THUMB_QUALITY = 70
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+_DOC_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+
+_lock = threading.Lock()
+_thumbs = OrderedDict()  # (doc_id, page, width, fmt) -> bytes
+_thumb_bytes = 0
+_docs = OrderedDict()    # doc_id -> (fitz.Document, lock)
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'documents_stored': 0}
+
+
+def _doc_path(doc_id):
+    if not _DOC_ID_RE.match(doc_id):
+        raise KeyError(doc_id)
+    return os.path.join(PREVIEW_DIR, doc_id + '.pdf')
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _evict_documents():
+    """Keeps the shared document store under its size budget, oldest access first."""
+    try:
+        entries = [e for e in os.scandir(PREVIEW_DIR) if e.name.endswith('.pdf')]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in entries)
+    budget = MAX_PREVIEW_DOCS_MB * 1024 * 1024
+    for entry in entries:
+        if total <= budget:
+            break
+        total -= entry.stat().st_size
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def store_document(path):
+    """
+    Copies an uploaded PDF into the preview store.
+
+    Returns:
+        tuple: (doc_id, page_count)
+    """
+    doc_id = _file_sha256(path)
+    target = _doc_path(doc_id)
+    os.makedirs(PREVIEW_DIR, exist_ok=True)
+
+    if not os.path.exists(target):
+        tmp = target + f'.{os.getpid()}.tmp'
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, target)
+        _evict_documents()
+        with _lock:
+            _stats['documents_stored'] += 1
+
+    return doc_id, page_count(doc_id)
+
+
+def _open(doc_id):
+    """Returns an open document and the lock that guards it (fitz is not thread-safe)."""
+    with _lock:
+        if doc_id in _docs:
+            _docs.move_to_end(doc_id)
+            return _docs[doc_id]
+
+    path = _doc_path(doc_id)
+    if not os.path.exists(path):
+        raise KeyError(doc_id)
+    os.utime(path)  # mark as recently used for _evict_documents
+    entry = (fitz.open(path), threading.Lock())
+
+    with _lock:
+        if doc_id in _docs:
+            entry[0].close()
+            return _docs[doc_id]
+        _docs[doc_id] = entry
+        while len(_docs) > OPEN_DOCS:
+            # Not closed explicitly: a render may still hold it; GC closes it
+            _docs.popitem(last=False)
+    return entry
+
+
+def page_count(doc_id):
+    """
+    Returns:
+        int: number of pages, or None if the document isn't stored
+    """
+    try:
+        doc, doc_lock = _open(doc_id)
+    except KeyError:
+        return None
+    with doc_lock:
+        return doc.page_count
+
+
+def snap_width(width):
+    return min(THUMB_WIDTHS, key=lambda w: abs(w - width))
+
+
+def render(doc_id, page_number, width=160, fmt='webp'):
+    """
+    Renders (or fetches from cache) one page thumbnail.
+
+    Args:
+        page_number: 1-based page number
+        width: requested width in pixels, snapped to THUMB_WIDTHS
+
+    Raises:
+        KeyError: unknown document
+        IndexError: page out of range
+
+    Returns:
+        tuple: (image_bytes, mimetype)
+    """
+    global _thumb_bytes
+    pil_format, mimetype = FORMATS[fmt]
+    width = snap_width(width)
+    key = (doc_id, page_number, width, pil_format)
+
+    with _lock:
+        data = _thumbs.get(key)
+        if data is not None:
+            _thumbs.move_to_end(key)
+            _stats['hits'] += 1
+            return data, mimetype
+        _stats['misses'] += 1
+
+    doc, doc_lock = _open(doc_id)
+    with doc_lock:
+        if not 1 <= page_number <= doc.page_count:
+            raise IndexError(page_number)
+        page = doc[page_number - 1]
+        scale = width / page.rect.width
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    out = io.BytesIO()
+    img.save(out, format=pil_format, quality=THUMB_QUALITY)
+    data = out.getvalue()
+
+    with _lock:
+        if key not in _thumbs:
+            _thumbs[key] = data
+            _thumb_bytes += len(data)
+        while _thumb_bytes > THUMB_CACHE_MB * 1024 * 1024 and _thumbs:
+            _, old = _thumbs.popitem(last=False)
+            _thumb_bytes -= len(old)
+            _stats['evictions'] += 1
+    return data, mimetype
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+        data['thumbnails'] = len(_thumbs)
+        data['thumbnail_bytes'] = _thumb_bytes
+        data['open_documents'] = len(_docs)
+    return data
@@ -0,0 +1,203 @@
+import io
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import fitz
+from PIL import Image
+
+# Image types we accept from inside an archive
+ZIP_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp'}
+
+# --- Zip-bomb guards (checked against the central directory, before decoding) ---
+MAX_MEMBERS = 1000
+MAX_MEMBER_SIZE_MB = 100
+MAX_TOTAL_SIZE_MB = 500
+MAX_COMPRESSION_RATIO = 100
+MAX_IMAGE_PIXELS = 80_000_000
+
+# A ZIP job already holds one CPU scheduler slot, so decoding only adds one
+# helper thread: the next image decodes while the current page is inserted.
+# In-flight decodes never exceed the pixels of one maximum-size image, so a
+# job needs no more memory than decoding one image at a time would.
+DECODE_WORKERS = 1
+DECODE_PIXEL_BUDGET = MAX_IMAGE_PIXELS
+
+
+class ZipLimitError(ValueError):
+    """Raised when an archive breaks one of the size/ratio limits."""
+
+
+def natural_key(name):
+    """Sort key so that 'page2.jpg' comes before 'page10.jpg'."""
+    return [int(part) if part.isdigit() else part.lower()
+            for part in re.split(r'(\d+)', name)]
+
+
+def list_image_members(zip_ref):
+    """
+    Picks the image members out of an open ZipFile and validates them
+    against the size limits using only the central directory.
+
+    Returns:
+        list: ZipInfo entries, natural-sorted by member name
+    """
+    members = []
+    total = 0
+
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+
+        base = os.path.basename(info.filename)
+        # Skip macOS resource forks and hidden files
+        if not base or base.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        if os.path.splitext(base.lower())[1] not in ZIP_IMAGE_EXTENSIONS:
+            continue
+
+        if info.file_size > MAX_MEMBER_SIZE_MB * 1024 * 1024:
+            raise ZipLimitError(f"{base} is larger than {MAX_MEMBER_SIZE_MB} MB uncompressed.")
+        if info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+            raise ZipLimitError(f"{base} has a suspicious compression ratio.")
+
+        total += info.file_size
+        if total > MAX_TOTAL_SIZE_MB * 1024 * 1024:
+            raise ZipLimitError(f"Archive expands to more than {MAX_TOTAL_SIZE_MB} MB.")
+
+        members.append(info)
+        if len(members) > MAX_MEMBERS:
+            raise ZipLimitError(f"Archive contains more than {MAX_MEMBERS} images.")
+
+    members.sort(key=lambda i: natural_key(i.filename))
+    return members
+
+
+def read_member(zip_ref, info):
+    """
+    Reads one member straight from the archive and parses its header only.
+
+    Returns:
+        tuple: (image_bytes, PIL image, pixels) or None if the member is unreadable or too large
+    """
+    try:
+        data = zip_ref.read(info)
+        img = Image.open(io.BytesIO(data))
+    except Exception as e:
+        print(f"Error reading {info.filename} from ZIP: {e}")
+        return None
+
+    # Header is parsed, pixels are not - reject oversized images now
+    width, height = img.size
+    if width * height > MAX_IMAGE_PIXELS:
+        print(f"Skipped oversized image in ZIP: {info.filename}")
+        return None
+    return data, img, width * height
+
+
+def _passes_through(img):
+    """Baseline JPEGs can be embedded as-is, no re-encode needed."""
+    return img.format == 'JPEG' and img.mode in ('RGB', 'L')
+
+
+def decode_member(name, data, img):
+    """
+    Turns one image into something a PDF page can embed.
+
+    Returns:
+        tuple: (width, height, image_bytes) or None if the image can't be decoded
+    """
+    try:
+        width, height = img.size
+        if _passes_through(img):
+            return width, height, data
+
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=95)
+        return width, height, out.getvalue()
+    except Exception as e:
+        print(f"Error reading {name} from ZIP: {e}")
+        return None
+
+
+def iter_decoded_members(zip_ref, members, workers=DECODE_WORKERS, pixel_budget=DECODE_PIXEL_BUDGET):
+    """
+    Decodes members on ``workers`` threads but yields them in archive order.
+
+    Decoded pixel buffers are the expensive part: an image is only handed
+    to the pool when the pixels of the decodes still in flight plus its own
+    fit ``pixel_budget`` (one image is always allowed, so nothing stalls).
+    JPEGs that are embedded as-is are never decoded and cost nothing.
+    """
+    pending = deque()  # (future or ready result, pixels counted against the budget)
+    in_flight = 0
+
+    def oldest():
+        nonlocal in_flight
+        item, pixels = pending.popleft()
+        in_flight -= pixels
+        return item.result() if isinstance(item, Future) else item
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for info in members:
+            member = read_member(zip_ref, info)
+            if member is None:
+                continue
+            data, img, pixels = member
+            if _passes_through(img):
+                pixels = 0
+
+            while pending and (in_flight + pixels > pixel_budget or len(pending) >= 2 * workers):
+                result = oldest()
+                if result:
+                    yield result
+
+            if pixels:
+                pending.append((pool.submit(decode_member, info.filename, data, img), pixels))
+                in_flight += pixels
+            else:
+                pending.append((decode_member(info.filename, data, img), 0))
+
+        while pending:
+            result = oldest()
+            if result:
+                yield result
+
+
+def zip_images_to_pdf(zip_path, output):
+    """
+    Converts the images inside a ZIP into a single PDF, one page per image,
+    adding pages in archive order as they are decoded.
+
+    Only the decoded pixel buffers are bounded (see iter_decoded_members).
+    The fitz document keeps every page's JPEG stream in memory until it is
+    saved, so memory still grows with the compressed size of the images.
+
+    Args:
+        zip_path: path of the uploaded archive
+        output: writable binary file object for the PDF
+
+    Returns:
+        int: number of pages written
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = list_image_members(zip_ref)
+        if not members:
+            return 0
+
+        doc = fitz.open()
+        try:
+            for width, height, data in iter_decoded_members(zip_ref, members):
+                page = doc.new_page(width=width, height=height)
+                page.insert_image(page.rect, stream=data)
+
+            pages = doc.page_count
+            if pages:
+                doc.save(output, garbage=1, deflate=True)
+            return pages
+        finally:
+            doc.close()